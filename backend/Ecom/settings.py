@@ -1,5 +1,5 @@
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 import os
 
 # -------------------------
@@ -12,9 +12,10 @@ DEBUG = True
 ALLOWED_HOSTS = ['*']  # Allow all for local dev/testing
 AUTH_USER_MODEL = 'api.CustomUser'
 
+# EmailOrPhoneBackend also accepts phone numbers, so ModelBackend would only
+# repeat the lookup (and the password hash) on every failed login.
 AUTHENTICATION_BACKENDS = [
     'api.backends.EmailOrPhoneBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
 # -------------------------
 # INSTALLED APPS
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
 # -------------------------
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Must be on top for CORS
+    'api.metrics.PerformanceMiddleware',  # Times everything below it
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,6 +54,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.routers.ReplicaRoutingMiddleware',  # Primary/replica reads and read-your-writes pins
 ]
 
 # -------------------------
@@ -70,30 +73,97 @@ WSGI_APPLICATION = 'Ecom.wsgi.application'
 # -------------------------
 # DATABASE
 # -------------------------
-DATABASES = {
-    'default': {
+# Each process keeps a psycopg 3 connection pool (DB_POOL, needs psycopg[pool]);
+# with pooling off, connections persist for DB_CONN_MAX_AGE seconds instead.
+DB_POOL = config('DB_POOL', default=True, cast=bool)
+
+
+def database(host, port):
+    return {
         'ENGINE': 'django.db.backends.postgresql',
         'NAME': config('NAME', default='ecommerce'),
         'USER': config('USER', default='postgres'),
         'PASSWORD': config('PASSWORD', default=''),
-        'HOST': config('HOST', default='localhost'),
-        'PORT': config('PORT', default='5432'),
+        'HOST': host,
+        'PORT': port,
+        'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pool': {
+                'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+                'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+                'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+            },
+        } if DB_POOL else {},
     }
+
+
+DATABASES = {
+    'default': database(config('HOST', default='localhost'), config('PORT', default='5432')),
 }
 
+# Read replicas (api.routers.ReplicaRouter), as host or host:port, comma-separated;
+# each becomes a `replicaN` alias. Pointing one at the primary's own host gives a
+# second alias to try the routing locally.
+for index, replica in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv())):
+    replica_host, _, replica_port = replica.partition(':')
+    DATABASES[f'replica{index + 1}'] = {
+        **database(replica_host, replica_port or DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+# How long a user reads from the primary after a write, and how long catalogue
+# cache fills do after a catalogue change: the replication lag allowed for
+DB_REPLICA_STICKY_SECONDS = config('DB_REPLICA_STICKY_SECONDS', default=15, cast=int)
+
+# -------------------------
+# CACHE
+# -------------------------
+# Local memory works out of the box; point CACHE_BACKEND at Redis/Memcached
+# when running more than one process so catalogue invalidation is shared.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='ecom'),
+    }
+}
+CATALOGUE_CACHE_TIMEOUT = config('CATALOGUE_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
 # -------------------------
 # REST FRAMEWORK CONFIG
 # -------------------------
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.fast.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# Token -> user cache (api.authentication.CachedTokenAuthentication)
+AUTH_TOKEN_CACHE_SIZE = config('AUTH_TOKEN_CACHE_SIZE', default=10000, cast=int)
+AUTH_TOKEN_CACHE_TTL = config('AUTH_TOKEN_CACHE_TTL', default=60, cast=int)
+
+# Keyset pagination (api.pagination.KeysetPagination)
+API_PAGE_SIZE = config('API_PAGE_SIZE', default=24, cast=int)
+API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=100, cast=int)
+# Serve list endpoints from .values() rows instead of model instances (api.fast.FastListMixin)
+API_FAST_LISTS = config('API_FAST_LISTS', default=True, cast=bool)
+
+# Request instrumentation (api.metrics): requests slower than PERF_SLOW_REQUEST_MS
+# are logged with their slowest queries, for a PERF_SLOW_LOG_SAMPLE_RATE share of requests
+PERF_SLOW_REQUEST_MS = config('PERF_SLOW_REQUEST_MS', default=500, cast=int)
+PERF_SLOW_LOG_SAMPLE_RATE = config('PERF_SLOW_LOG_SAMPLE_RATE', default=0.1, cast=float)
+
+# Minutes a checkout's stock hold lasts (api.models.StockReservation)
+STOCK_RESERVATION_MINUTES = config('STOCK_RESERVATION_MINUTES', default=15, cast=int)
+
 # -------------------------
 # STATIC & MEDIA
 # -------------------------
@@ -104,6 +174,12 @@ MEDIA_URL = '/media/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Resized product images (api.images). Their names are content-hashed, so the
+# web server can serve PRODUCT_IMAGE_DERIVATIVES_DIR with a far-future,
+# immutable Cache-Control.
+PRODUCT_IMAGE_WIDTHS = [320, 640, 1024]
+PRODUCT_IMAGE_DERIVATIVES_DIR = 'ecom/images/derived'
+
 
 # -------------------------
 # TEMPLATE CONFIG (NOT USED FOR DRF)
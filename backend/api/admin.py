@@ -1,18 +1,39 @@
 from django.contrib import admin
-from .models import Product, Cart, OrderHistory, Review, ContactForm, Address, CustomUser
+from .models import Product, ProductVariantPrice, ProductStock, Cart, OrderHistory, Review, ContactForm, Address, CustomUser
 
 
 # ------------------- Product Admin -------------------
+class ProductVariantPriceInline(admin.TabularInline):
+    """Prices are derived from the MRP on save, so they are shown read-only."""
+    model = ProductVariantPrice
+    fields = ('variant', 'price')
+    readonly_fields = ('variant', 'price')
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class ProductStockInline(admin.TabularInline):
+    """Units on hand per variant; a hot variant may be split over several shards."""
+    model = ProductStock
+    fields = ('variant', 'shard', 'stock')
+    extra = 0
+
+
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     list_display = ('product_name', 'product_variant', 'product_mrp', 'timestamp')
     search_fields = ('product_name', 'product_variant')
+    inlines = [ProductVariantPriceInline, ProductStockInline]
 
 
 # ------------------- Cart Admin -------------------
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
     list_display = ('user', 'product', 'qty', 'variant')
+    list_select_related = ('user', 'product')
     search_fields = ('user__phone_number', 'product__product_name')
 
 
@@ -28,6 +49,8 @@ class AddressAdmin(admin.ModelAdmin):
 class OrderHistoryAdmin(admin.ModelAdmin):
     list_display = ('user', 'product', 'qty', 'status', 'bill_amount', 'order_date')
     search_fields = ('user__phone_number', 'product__product_name', 'status')
+    # Status moves through the bulk-status endpoint, which applies STATUS_TRANSITIONS and returns stock
+    readonly_fields = ('status', 'bill_amount')
 
 
 # ------------------- Review Admin -------------------
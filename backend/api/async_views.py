@@ -0,0 +1,107 @@
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework import exceptions
+from rest_framework.request import Request
+
+from .cache import (
+    CATALOGUE_CHANGED_KEY, aget_catalogue_version, catalogue_headers, catalogue_key, is_not_modified, not_modified,
+)
+from .fast import FastJSONRenderer
+from .models import Product, ProductRating, Review
+from .pagination import KeysetPagination
+from .routers import primary
+from .serializers import ProductRatingSerializer, ProductSerializer, ReviewSerializer
+from .views import ProductViewSet
+
+
+# -----------------------------
+# ASYNC CATALOGUE READS
+# -----------------------------
+# Same JSON as the DRF endpoints and the same versioned catalogue cache, but
+# queried with the async ORM so a catalogue read does not hold a thread under ASGI.
+
+class NotFound(Exception):
+    pass
+
+
+async def _cached_json(request, build):
+    """Serve `await build()` through the catalogue cache, with ETag/304 support."""
+    key = catalogue_key(await aget_catalogue_version(), request.get_full_path())
+    headers = catalogue_headers(key)
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+
+    body = await cache.aget(key)
+    if body is None:
+        try:
+            # As in CatalogueCacheMixin: fill from the primary while replicas may lag a change
+            with primary() if await cache.aget(CATALOGUE_CHANGED_KEY) else nullcontext():
+                data = await build()
+        except NotFound as error:
+            return JsonResponse({'detail': str(error)}, status=404)
+        body = FastJSONRenderer().render(data)
+        await cache.aset(key, body, settings.CATALOGUE_CACHE_TIMEOUT)
+
+    return HttpResponse(body, content_type='application/json', headers=headers)
+
+
+async def _paginate(request, queryset, serializer_class):
+    request = Request(request)
+    paginator = KeysetPagination()
+    try:
+        page = paginator.page_queryset(queryset, request)
+    except exceptions.NotFound as error:
+        # No DRF exception handler runs here; _cached_json answers 404 itself
+        raise NotFound(str(error.detail))
+    rows = [obj async for obj in page.aiterator(chunk_size=paginator.page_size + 1)]
+    serializer = serializer_class(paginator.set_page(rows), many=True, context={'request': request})
+    return paginator.get_paginated_response(serializer.data).data
+
+
+@require_GET
+async def product_list(request):
+    async def build():
+        queryset = ProductViewSet.order_queryset(
+            Product.objects.select_related('rating').prefetch_related('prices'), request.GET.get('ordering'),
+        )
+        return await _paginate(request, queryset, ProductSerializer)
+
+    return await _cached_json(request, build)
+
+
+@require_GET
+async def product_detail(request, pk):
+    async def build():
+        try:
+            product = await Product.objects.select_related('rating').prefetch_related('prices').aget(pk=pk)
+        except Product.DoesNotExist:
+            raise NotFound('No Product matches the given query.')
+        return ProductSerializer(product, context={'request': request}).data
+
+    return await _cached_json(request, build)
+
+
+@require_GET
+async def product_reviews(request, pk):
+    async def build():
+        if not await Product.objects.filter(pk=pk).aexists():
+            raise NotFound('No Product matches the given query.')
+        return await _paginate(request, Review.objects.filter(product_id=pk), ReviewSerializer)
+
+    return await _cached_json(request, build)
+
+
+@require_GET
+async def product_rating(request, pk):
+    async def build():
+        try:
+            rating = await ProductRating.objects.aget(product_id=pk)
+        except ProductRating.DoesNotExist:
+            raise NotFound('No Product matches the given query.')
+        return ProductRatingSerializer(rating).data
+
+    return await _cached_json(request, build)
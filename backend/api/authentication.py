@@ -0,0 +1,72 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """Thread-safe, size-bounded LRU of token key -> Token (with its user), with a TTL."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            token, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return token
+
+    def set(self, key, token):
+        with self._lock:
+            self._entries[key] = (token, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def revoke(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def revoke_user(self, user_id):
+        with self._lock:
+            for key in [key for key, (token, _) in self._entries.items() if token.user_id == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_TTL)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that keeps resolved tokens in a per-process LRU.
+
+    Entries are revoked when their token is deleted (logout) or their user is
+    saved (password change, deactivation, profile edits); the TTL bounds how
+    long another process can keep serving a revoked entry.
+    """
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, token)
+        # Each request gets its own copy so views can mutate request.user safely
+        token = copy.copy(token)
+        token.user = copy.copy(token.user)
+        return token.user, token
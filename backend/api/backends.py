@@ -1,23 +1,32 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.db.models import Case, Q, Value, When
 
 User = get_user_model()
 
 class EmailOrPhoneBackend(ModelBackend):
     """Allow login with either email or phone number."""
     def authenticate(self, request, username=None, password=None, **kwargs):
-        user = None
         if username is None:
-            username = kwargs.get('email')
+            username = kwargs.get('email') or kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
 
-        try:
-            user = User.objects.get(email=username)
-        except User.DoesNotExist:
-            try:
-                user = User.objects.get(phone_number=username)
-            except User.DoesNotExist:
-                return None
+        # One indexed lookup for both identifiers, with the user's token joined
+        # in. A phone match wins over an email match, and duplicate emails
+        # resolve to the oldest account.
+        user = (
+            User.objects.select_related('auth_token')
+            .filter(Q(phone_number=username) | Q(email=username))
+            .order_by(Case(When(phone_number=username, then=Value(0)), default=Value(1)), 'id')
+            .first()
+        )
 
-        if user and user.check_password(password):
+        if user is None:
+            # Run the hasher anyway so a miss takes as long as a wrong password
+            User().set_password(password)
+            return None
+
+        if user.check_password(password) and self.user_can_authenticate(user):
             return user
         return None
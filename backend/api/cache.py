@@ -0,0 +1,109 @@
+import hashlib
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from .routers import primary
+
+CATALOGUE_VERSION_KEY = 'catalogue:version'
+# Present for DB_REPLICA_STICKY_SECONDS after a bump, while replicas may still lag
+CATALOGUE_CHANGED_KEY = 'catalogue:changed'
+
+
+# -----------------------
+# Catalogue version
+# -----------------------
+def get_catalogue_version():
+    """Current catalogue version, seeded from the clock if the key is missing."""
+    version = cache.get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        # A clock seed (not 1) means an evicted version key can never
+        # resurrect entries cached under an older version.
+        cache.add(CATALOGUE_VERSION_KEY, time.time_ns())
+        version = cache.get(CATALOGUE_VERSION_KEY)
+    return version
+
+
+async def aget_catalogue_version():
+    version = await cache.aget(CATALOGUE_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CATALOGUE_VERSION_KEY, time.time_ns())
+        version = await cache.aget(CATALOGUE_VERSION_KEY)
+    return version
+
+
+def bump_catalogue_version():
+    """Invalidate every cached catalogue response at once."""
+    cache.set(CATALOGUE_CHANGED_KEY, 1, settings.DB_REPLICA_STICKY_SECONDS)
+    try:
+        return cache.incr(CATALOGUE_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOGUE_VERSION_KEY, time.time_ns())
+        return cache.get(CATALOGUE_VERSION_KEY)
+
+
+def catalogue_key(version, path):
+    digest = hashlib.md5(path.encode()).hexdigest()
+    return f'catalogue:{version}:{digest}'
+
+
+def catalogue_headers(key):
+    return {'ETag': f'"{key.split(":", 1)[1]}"', 'Cache-Control': 'no-cache', 'Vary': 'Accept'}
+
+
+def is_not_modified(request, headers):
+    return headers['ETag'] in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+
+
+def not_modified(headers):
+    response = HttpResponseNotModified()
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+# -----------------------
+# Viewset mixin
+# -----------------------
+class CatalogueCacheMixin:
+    """
+    Serve list/retrieve responses from the versioned catalogue cache.
+
+    Rendered JSON bytes are cached per (catalogue version, request path), so a
+    cached body never changes under a given version and its ETag can be strong.
+    A matching If-None-Match is answered with 304 before the queryset is built.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        # Only JSON is cached; the browsable API is rendered as usual
+        if request.accepted_renderer.format != 'json':
+            return handler(request, *args, **kwargs)
+
+        key = catalogue_key(get_catalogue_version(), request.get_full_path())
+        headers = catalogue_headers(key)
+        if is_not_modified(request, headers):
+            return not_modified(headers)
+
+        body = cache.get(key)
+        if body is None:
+            # Right after a change a replica may not have it yet, and the body is cached for the whole version
+            with primary() if cache.get(CATALOGUE_CHANGED_KEY) else nullcontext():
+                response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            body = request.accepted_renderer.render(
+                response.data, request.accepted_media_type, self.get_renderer_context()
+            )
+            cache.set(key, body, settings.CATALOGUE_CACHE_TIMEOUT)
+
+        return HttpResponse(body, content_type=request.accepted_media_type, headers=headers)
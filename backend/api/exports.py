@@ -0,0 +1,100 @@
+import csv
+import io
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import OrderHistory
+
+# (CSV header, values_list lookup); product and address columns are joined in SQL
+ORDER_EXPORT_COLUMNS = [
+    ('order_id', 'id'),
+    ('order_date', 'order_date'),
+    ('status', 'status'),
+    ('delivery_date', 'delivery_date'),
+    ('customer_phone', 'user__phone_number'),
+    ('customer_name', 'user__first_name'),
+    ('product_id', 'product_id'),
+    ('product_name', 'product__product_name'),
+    ('variant', 'variant'),
+    ('qty', 'qty'),
+    ('bill_amount', 'bill_amount'),
+    ('address_lane1', 'address__address_lane1'),
+    ('address_landmark', 'address__address_landmark'),
+    ('address_city', 'address__address_city'),
+    ('address_district', 'address__address_district'),
+    ('address_state', 'address__address_state'),
+    ('address_pincode', 'address__address_pincode'),
+]
+
+
+def parse_order_filters(date_from=None, date_to=None, statuses=None):
+    """Validate export filters; dates are inclusive YYYY-MM-DD in the site time zone."""
+    filters = {}
+    for name, value, lookup, offset in [
+        ('from', date_from, 'order_date__gte', 0),
+        ('to', date_to, 'order_date__lt', 1),
+    ]:
+        if value:
+            day = parse_date(value)
+            if day is None:
+                raise ValueError(f"'{name}' must be a date like 2025-01-31")
+            filters[lookup] = timezone.make_aware(datetime.combine(day + timedelta(days=offset), time.min))
+
+    if statuses:
+        filters['status__in'] = parse_statuses(statuses)
+    return filters
+
+
+def parse_statuses(statuses):
+    """
+    Order statuses from "PENDING,SHIPPED" (a query string) or a list (a JSON
+    body), upper-cased; raises ValueError for anything else or an unknown status.
+    """
+    if isinstance(statuses, str):
+        statuses = statuses.split(',')
+    if not isinstance(statuses, list) or not all(isinstance(status, str) for status in statuses):
+        raise ValueError("'status' must be a comma-separated string or a list of statuses")
+    statuses = [status.strip().upper() for status in statuses if status.strip()]
+    valid = dict(OrderHistory.STATUS_CHOICES)
+    unknown = [status for status in statuses if status not in valid]
+    if unknown:
+        raise ValueError(f"unknown status {unknown}; expected some of {list(valid)}")
+    return statuses
+
+
+def parse_ids(value, name):
+    """Ids from a comma-separated query parameter; raises ValueError."""
+    try:
+        ids = [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        ids = None
+    # Ids are BigAutoField primary keys
+    if not ids or not all(0 < pk < 2 ** 63 for pk in ids):
+        raise ValueError(f"'{name}' must be comma-separated ids")
+    return ids
+
+
+def order_csv_chunks(filters, chunk_size=2000):
+    """
+    Yield the export as CSV text, one chunk per `chunk_size` orders. Rows come
+    from a server-side cursor, so memory stays flat however many orders match.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in ORDER_EXPORT_COLUMNS])
+
+    rows = (
+        OrderHistory.objects.filter(**filters)
+        .order_by('order_date', 'id')
+        .values_list(*(lookup for _, lookup in ORDER_EXPORT_COLUMNS))
+        .iterator(chunk_size=chunk_size)
+    )
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
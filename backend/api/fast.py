@@ -0,0 +1,199 @@
+from operator import itemgetter
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .images import derivative_urls
+from .metrics import timing_serialization
+from .models import ProductVariantPrice
+from .serializers import ProductRatingSerializer, ProductSerializer
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder is used instead
+    orjson = None
+
+
+# -----------------------
+# Renderer
+# -----------------------
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed. The bytes are
+    the same as JSONRenderer's compact output; anything orjson cannot encode
+    the same way (indented output, non-string keys, huge ints) falls back to it.
+    """
+    _default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            # Datetimes go through DRF's encoder so they are formatted the same way
+            body = orjson.dumps(data, default=self._default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer escapes the two line terminators JavaScript does not allow in strings
+        return body.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+# -----------------------
+# values() row mapping
+# -----------------------
+class RowMapper:
+    """
+    Turn .values() rows into exactly what `serializer` outputs for the same
+    model instances. How each field is read and formatted is worked out once,
+    from the serializer's own fields; mapping a row is then a dict
+    comprehension over plain callables, with no model instances or
+    per-row field lookups.
+    """
+
+    def __init__(self, serializer, prefix=''):
+        self.prefix = prefix
+        self.request = serializer.context.get('request')
+        self.columns = []
+        # Run on the fetched rows before mapping, e.g. to fetch prices in one query
+        self.loaders = []
+        model = serializer.Meta.model
+        custom = CUSTOM_FIELDS.get(type(serializer), {})
+
+        self.fields = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in custom:
+                represent = custom[name](self)
+            elif isinstance(field, serializers.BaseSerializer):
+                represent = self.nested(field)
+            elif isinstance(field, serializers.RelatedField):
+                represent = self.column(model._meta.get_field(field.source).attname)
+            elif isinstance(field, serializers.FileField):
+                represent = self.file(model._meta.get_field(field.source), field)
+            else:
+                represent = self.plain(field.source, field.to_representation)
+            self.fields.append((name, represent))
+
+    def column(self, lookup):
+        """Fetch `lookup` (relative to this mapper) and return a getter for it."""
+        key = self.prefix + lookup
+        if key not in self.columns:
+            self.columns.append(key)
+        return itemgetter(key)
+
+    def plain(self, lookup, to_representation):
+        get = self.column(lookup)
+
+        def represent(row):
+            value = get(row)
+            return None if value is None else to_representation(value)
+        return represent
+
+    def file(self, model_field, field):
+        # values() gives the stored name rather than a FieldFile
+        get = self.column(model_field.attname)
+        storage, request = model_field.storage, self.request
+        if not getattr(field, 'use_url', True):
+            return lambda row: get(row) or None
+
+        def represent(row):
+            name = get(row)
+            if not name:
+                return None
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return represent
+
+    def nested(self, serializer):
+        child = RowMapper(serializer, f'{self.prefix}{serializer.source}__')
+        self.columns += [column for column in child.columns if column not in self.columns]
+        self.loaders += child.loaders
+        # The related row is missing (NULL foreign key, no reverse one-to-one) when its pk is
+        present = self.column(f'{serializer.source}__pk')
+        return lambda row: None if present(row) is None else child.map_row(row)
+
+    def map_row(self, row):
+        return {name: represent(row) for name, represent in self.fields}
+
+    def map(self, rows):
+        for load in self.loaders:
+            load(rows)
+        return [self.map_row(row) for row in rows]
+
+
+def _product_price_data(mapper):
+    get_id, get_variants = mapper.column('id'), mapper.column('product_variant')
+    prices = {}
+
+    def load(rows):
+        prices.clear()
+        ids = {get_id(row) for row in rows} - {None}
+        for product_id, variant, price in ProductVariantPrice.objects.filter(product_id__in=ids).values_list(
+            'product_id', 'variant', 'price'
+        ):
+            prices.setdefault(product_id, {})[variant] = float(price)
+    mapper.loaders.append(load)
+
+    def represent(row):
+        own = prices.get(get_id(row), {})
+        return {variant: own[variant] for variant in get_variants(row) if variant in own}
+    return represent
+
+
+def _product_images(mapper):
+    get, request = mapper.column('image_derivatives'), mapper.request
+    return lambda row: derivative_urls(get(row), request)
+
+
+def _rating_average(mapper):
+    get = mapper.column('average')
+    return lambda row: round(get(row), 2)
+
+
+def _rating_histogram(mapper):
+    stars = [(str(star), mapper.column(f'star_{star}')) for star in range(1, 6)]
+    return lambda row: {star: get(row) for star, get in stars}
+
+
+# Fields computed in Python (method fields, properties) and how to build them from columns
+CUSTOM_FIELDS = {
+    ProductSerializer: {'product_price_data': _product_price_data, 'images': _product_images},
+    ProductRatingSerializer: {'average': _rating_average, 'histogram': _rating_histogram},
+}
+
+
+# -----------------------
+# Viewset mixin
+# -----------------------
+class FastListMixin:
+    """
+    Serve `list` from .values() rows mapped by RowMapper instead of through
+    the serializer, when settings.API_FAST_LISTS is on. The JSON is the same;
+    api/tests/test_fast_lists.py compares the two paths byte for byte.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not settings.API_FAST_LISTS:
+            return super().list(request, *args, **kwargs)
+
+        mapper = RowMapper(self.get_serializer())
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        paginator = self.paginator
+        if paginator is None:
+            rows = list(queryset.values(*mapper.columns))
+            with timing_serialization():
+                return Response(mapper.map(rows))
+
+        page = paginator.page_queryset(queryset, request)
+        columns = mapper.columns + [column for column in paginator.position_lookups if column not in mapper.columns]
+        rows = paginator.set_page(list(page.values(*columns)))
+        # Mapping rows stands in for the serializer, so it is timed as one
+        with timing_serialization():
+            data = mapper.map(rows)
+        return paginator.get_paginated_response(data)
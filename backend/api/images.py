@@ -0,0 +1,70 @@
+import hashlib
+import io
+import posixpath
+import struct
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# Encoder name -> (file extension, save options)
+DERIVATIVE_FORMATS = {
+    'JPEG': ('jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'WEBP': ('webp', {'quality': 80, 'method': 4}),
+}
+
+# What Pillow raises for missing, truncated, corrupt or oversized images
+IMAGE_ERRORS = (OSError, ValueError, SyntaxError, EOFError, struct.error, Image.DecompressionBombError)
+
+
+def build_derivatives(name, storage=default_storage):
+    """
+    Write resized JPEG and WebP copies of the stored image `name`.
+
+    Every derivative is named after a hash of its own bytes, so its URL can be
+    cached forever and regenerating an unchanged image rewrites nothing.
+    Returns {'source': name, 'jpg': {width: path}, 'webp': {width: path}}.
+    """
+    with storage.open(name, 'rb') as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original.load()
+
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA' if 'A' in original.getbands() else 'RGB')
+
+    # Never upscale; an image narrower than every width gets one copy at its own size
+    widths = [width for width in settings.PRODUCT_IMAGE_WIDTHS if width < original.width] or [original.width]
+    stem = posixpath.splitext(posixpath.basename(name))[0]
+    derivatives = {'source': name}
+
+    for width in widths:
+        height = max(1, round(original.height * width / original.width))
+        resized = original.resize((width, height), Image.LANCZOS) if width != original.width else original
+
+        for image_format, (extension, options) in DERIVATIVE_FORMATS.items():
+            image = resized.convert('RGB') if image_format == 'JPEG' else resized
+            buffer = io.BytesIO()
+            image.save(buffer, image_format, **options)
+            content = buffer.getvalue()
+
+            digest = hashlib.sha256(content).hexdigest()[:12]
+            path = posixpath.join(settings.PRODUCT_IMAGE_DERIVATIVES_DIR, f'{stem}-{width}w.{digest}.{extension}')
+            if not storage.exists(path):
+                storage.save(path, ContentFile(content))
+            derivatives.setdefault(extension, {})[str(width)] = path
+
+    return derivatives
+
+
+def derivative_urls(derivatives, request=None, storage=default_storage):
+    """{'jpg': {width: url}, 'webp': {width: url}} for serializers and srcset."""
+    urls = {}
+    for extension, paths in derivatives.items():
+        if extension == 'source':
+            continue
+        urls[extension] = {
+            width: request.build_absolute_uri(storage.url(path)) if request else storage.url(path)
+            for width, path in paths.items()
+        }
+    return urls
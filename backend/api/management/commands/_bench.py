@@ -0,0 +1,10 @@
+# Shared by the benchmark commands (the leading underscore keeps Django from
+# treating this module as a command).
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[rank]
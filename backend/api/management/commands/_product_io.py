@@ -0,0 +1,53 @@
+# Shared by import_products and export_products (the leading underscore keeps
+# Django from treating this module as a command).
+import csv
+import json
+
+from api.models import Product
+
+FIELDS = ['id', 'product_name', 'product_desc', 'product_variant', 'product_mrp', 'product_image', 'timestamp']
+VARIANTS = [variant for variant, _ in Product.PRODUCT_VARIANT]
+
+
+def detect_format(path, requested):
+    if requested:
+        return requested
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_rows(handle, file_format):
+    """
+    Yield (line number, row dict, None) lazily so input size does not matter.
+    A line that is not a JSON object yields (line number, its text, error)
+    instead, so one bad line is rejected like any other invalid row.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(handle)
+        for row in reader:
+            yield reader.line_num, row, None
+    else:
+        for line_number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as error:
+                yield line_number, line.rstrip('\n'), f"invalid JSON: {error}"
+                continue
+            if isinstance(row, dict):
+                yield line_number, row, None
+            else:
+                yield line_number, line.rstrip('\n'), "expected a JSON object"
+
+
+def parse_variants(value):
+    """'100g|1kg', '100g,1kg' or ['100g', '1kg'] -> ordered, validated list."""
+    if isinstance(value, str):
+        value = value.replace('|', ',').split(',')
+    variants = [variant.strip() for variant in value or [] if variant.strip()]
+    unknown = [variant for variant in variants if variant not in VARIANTS]
+    if unknown:
+        raise ValueError(f"unknown variants {unknown}; expected some of {VARIANTS}")
+    if not variants:
+        raise ValueError("at least one variant is required")
+    return sorted(set(variants), key=VARIANTS.index)
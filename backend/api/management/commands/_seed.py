@@ -0,0 +1,109 @@
+# Synthetic catalogue, customers, orders and reviews for benchmarks (the leading
+# underscore keeps Django from treating this module as a command).
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from api.models import (
+    Address, CustomUser, DailySales, OrderHistory, Product, ProductRating, ProductVariantPrice, Review,
+)
+
+SEED_PASSWORD = 'bench-password'
+VARIANTS = [variant for variant, _ in Product.PRODUCT_VARIANT]
+STATUS_WEIGHTS = {"PENDING": 5, "PROCESSING": 5, "SHIPPED": 10, "DELIVERED": 70, "CANCELLED": 10}
+
+
+def seed_phone(index):
+    return f'7{index:09d}'
+
+
+def seed(products=2000, users=200, orders=20000, reviews=5000, rng=None, batch_size=2000):
+    """
+    Bulk-insert a synthetic shop. Every user gets the password SEED_PASSWORD,
+    a token and an address, so benchmarks can log in or authenticate directly.
+    Returns the created users.
+    """
+    rng = rng or random.Random(0)
+    now = timezone.now()
+
+    with transaction.atomic():
+        catalogue = Product.objects.bulk_create(
+            [
+                Product(
+                    product_name=f'Product {index:05d}',
+                    product_desc='Synthetic product for benchmarks.',
+                    product_variant=sorted(rng.sample(VARIANTS, rng.randint(1, len(VARIANTS))), key=VARIANTS.index),
+                    product_mrp=round(rng.uniform(20, 500), 2),
+                )
+                for index in range(products)
+            ],
+            batch_size=batch_size,
+        )
+        ProductVariantPrice.objects.bulk_create(
+            [
+                ProductVariantPrice(product=product, variant=variant, price=Product.variant_price(product.product_mrp, variant))
+                for product in catalogue
+                for variant in product.product_variant
+            ],
+            batch_size=batch_size,
+        )
+
+        password = make_password(SEED_PASSWORD)
+        customers = CustomUser.objects.bulk_create(
+            [
+                CustomUser(
+                    phone_number=seed_phone(index), email=f'user{index}@example.com',
+                    first_name='Bench', last_name=f'User {index}', password=password,
+                )
+                for index in range(users)
+            ],
+            batch_size=batch_size,
+        )
+        Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in customers], batch_size=batch_size)
+        addresses = Address.objects.bulk_create(
+            [
+                Address(
+                    user=user, address_lane1=f'{rng.randint(1, 999)} Main Road', address_city='Jaipur',
+                    address_district='Jaipur', address_state='Rajasthan', address_pincode='302001',
+                )
+                for user in customers
+            ],
+            batch_size=batch_size,
+        )
+
+        statuses, weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+        history = []
+        for _ in range(orders):
+            index = rng.randrange(users)
+            product = rng.choice(catalogue)
+            variant = rng.choice(product.product_variant)
+            qty = rng.randint(1, 5)
+            order_date = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+            status = rng.choices(statuses, weights)[0]
+            history.append(OrderHistory(
+                user=customers[index], address=addresses[index], product=product, variant=variant, qty=qty,
+                order_date=order_date, status=status,
+                delivery_date=order_date + timedelta(days=rng.randint(1, 7)) if status == "DELIVERED" else None,
+                bill_amount=float(Product.variant_price(product.product_mrp, variant) * qty),
+            ))
+        OrderHistory.objects.bulk_create(history, batch_size=batch_size)
+
+        pairs = set()
+        while len(pairs) < min(reviews, products * users):
+            pairs.add((rng.randrange(products), rng.randrange(users)))
+        Review.objects.bulk_create(
+            [
+                Review(product=catalogue[product], user=customers[user], star=str(rng.choices(range(1, 6), [5, 5, 10, 30, 50])[0]),
+                       content='Synthetic review.')
+                for product, user in pairs
+            ],
+            batch_size=batch_size,
+        )
+
+        ProductRating.objects.rebuild()
+        DailySales.objects.rebuild()
+    return customers
@@ -0,0 +1,214 @@
+import json
+import random
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+from api.authentication import token_cache
+from api.models import Address, CustomUser, Product
+
+from ._bench import percentile
+from ._seed import SEED_PASSWORD, seed
+
+API = '/api/v1/'
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+# -----------------------
+# Scenarios
+# -----------------------
+# Each takes (worker, rng) and returns (method, path, JSON body or None)
+SCENARIOS = {
+    'product_list': lambda worker, rng: ('get', f'{API}Product/', None),
+    'product_detail': lambda worker, rng: ('get', f'{API}Product/{rng.choice(worker.product_ids)}/', None),
+    'add_to_cart': lambda worker, rng: ('post', f'{API}Cart/', worker.item(rng, rng.choice(worker.product_ids))),
+    'cart_list': lambda worker, rng: ('get', f'{API}Cart/', None),
+    'checkout': lambda worker, rng: ('post', f'{API}orders/create/', {
+        'address_id': worker.address_id,
+        'items': [worker.item(rng, product_id) for product_id in rng.sample(worker.product_ids, 2)],
+    }),
+    'order_history': lambda worker, rng: ('get', f'{API}orders/', None),
+    'login': lambda worker, rng: ('post', f'{API}login/', {'phone': worker.phone, 'password': SEED_PASSWORD}),
+}
+
+
+class Worker:
+    def __init__(self, user, address_id, product_variants):
+        self.phone = user.phone_number
+        self.address_id = address_id
+        self.product_ids = list(product_variants)
+        self.product_variants = product_variants
+        # Server errors count as failed requests instead of stopping the worker
+        self.client = Client(raise_request_exception=False, HTTP_AUTHORIZATION=f'Token {user.auth_token.key}')
+
+    def item(self, rng, product_id):
+        """A cart/checkout line in one of the variants the product is sold in."""
+        return {'product_id': product_id, 'variant': rng.choice(self.product_variants[product_id]), 'quantity': 1}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the API's hot paths in-process against a freshly seeded test database. "
+        "Reports req/s, p50/p95/p99 and SQL queries per request for each scenario; --save "
+        "writes them as a JSON baseline and --baseline fails the run on a regression. A scenario "
+        "with more than --max-error-rate non-2xx responses fails the run too. Run it "
+        "on PostgreSQL: SQLite rejects concurrent writers, so write scenarios would report errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', action='append', choices=list(SCENARIOS), help="Repeat to pick several; default: all.")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per scenario.")
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--products', type=int, default=2000)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--orders', type=int, default=20000)
+        parser.add_argument('--reviews', type=int, default=5000)
+        parser.add_argument('--keepdb', action='store_true', help="Reuse (and keep) the seeded test database.")
+        parser.add_argument('--save', help="Write the results to this JSON file.")
+        parser.add_argument('--baseline', help="JSON file from an earlier --save to compare against.")
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help="Percent by which req/s may drop or p95 may grow before the run fails.")
+        parser.add_argument('--max-error-rate', type=float, default=1.0,
+                            help="Percent of non-2xx responses a scenario may return before the run fails.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as handle:
+                baseline = json.load(handle)
+
+        # As under the test runner: no query log, production code paths
+        settings.DEBUG = False
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            if not Product.objects.exists():
+                started = time.perf_counter()
+                seed(options['products'], options['users'], options['orders'], options['reviews'])
+                self.stdout.write(f"Seeded the test database in {time.perf_counter() - started:.1f}s")
+            results = self.run_all(options)
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+
+        self.stdout.write(f"{'scenario':<16}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'errors':>8}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<16}{result['rps']:>9.0f}{result['p50']:>9.1f}{result['p95']:>9.1f}"
+                f"{result['p99']:>9.1f}{result['queries']:>9.2f}{result['errors']:>8}"
+            )
+
+        # A scenario that mostly fails times the error path, not the endpoint
+        failing = [
+            f"{name}: {result['errors']} of {result['requests']} requests were not 2xx"
+            for name, result in results.items()
+            if result['errors'] > result['requests'] * options['max_error_rate'] / 100
+        ]
+        for failure in failing:
+            self.stdout.write(self.style.ERROR(failure))
+        if failing:
+            raise CommandError(f"{len(failing)} scenario(s) above --max-error-rate {options['max_error_rate']}%.")
+
+        if options['save']:
+            with open(options['save'], 'w') as handle:
+                json.dump({
+                    'created': timezone.now().isoformat(),
+                    'options': {name: options[name] for name in ('requests', 'concurrency', 'products', 'users', 'orders', 'reviews')},
+                    'results': results,
+                }, handle, indent=2)
+            self.stdout.write(f"Saved results to {options['save']}")
+
+        if baseline is not None:
+            regressions = self.compare(results, baseline['results'], options['threshold'] / 100)
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(regression))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}.")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}."))
+
+    def run_all(self, options):
+        product_variants = {
+            product_id: list(variants) for product_id, variants in Product.objects.values_list('id', 'product_variant')
+        }
+        users = list(CustomUser.objects.filter(auth_token__isnull=False).select_related('auth_token')[:options['concurrency']])
+        addresses = dict(Address.objects.filter(user__in=users).values_list('user_id', 'id'))
+        if len(users) < options['concurrency']:
+            raise CommandError(f"Need at least {options['concurrency']} seeded users with tokens; use --users.")
+        workers = [Worker(user, addresses.get(user.pk), product_variants) for user in users]
+
+        cache.clear()
+        token_cache.clear()
+        return {
+            name: self.run(SCENARIOS[name], workers, options['requests'])
+            for name in options['scenario'] or SCENARIOS
+        }
+
+    def run(self, scenario, workers, total):
+        latencies, queries, errors = [], [], 0
+        lock = threading.Lock()
+        counter = iter(range(total))
+
+        def drive(worker, rng_seed):
+            nonlocal errors
+            rng = random.Random(rng_seed)
+            local, local_queries, failed = [], [], 0
+            try:
+                for _ in counter:
+                    method, path, body = scenario(worker, rng)
+                    started = time.perf_counter()
+                    if body is None:
+                        response = getattr(worker.client, method)(path)
+                    else:
+                        response = getattr(worker.client, method)(path, body, content_type='application/json')
+                    local.append((time.perf_counter() - started) * 1000)
+                    match = QUERIES.search(response.get('Server-Timing', ''))
+                    local_queries.append(int(match.group(1)) if match else 0)
+                    failed += not 200 <= response.status_code < 300
+            finally:
+                connection.close()
+                with lock:
+                    latencies.extend(local)
+                    queries.extend(local_queries)
+                    errors += failed
+
+        threads = [threading.Thread(target=drive, args=(worker, index)) for index, worker in enumerate(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'requests': len(latencies),
+            'rps': round(len(latencies) / elapsed, 1),
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'queries': round(sum(queries) / len(queries), 2) if queries else 0.0,
+            'errors': errors,
+        }
+
+    def compare(self, results, baseline, threshold):
+        regressions = []
+        for name, result in results.items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            if result['rps'] < before['rps'] * (1 - threshold):
+                regressions.append(f"{name}: {result['rps']:.0f} req/s, baseline {before['rps']:.0f}")
+            if result['p95'] > before['p95'] * (1 + threshold):
+                regressions.append(f"{name}: p95 {result['p95']:.1f} ms, baseline {before['p95']:.1f} ms")
+            # Query counts barely vary between runs, so any real increase counts
+            if result['queries'] > before['queries'] + 0.5:
+                regressions.append(f"{name}: {result['queries']:.2f} queries/request, baseline {before['queries']:.2f}")
+            if result['errors'] > before['errors']:
+                regressions.append(f"{name}: {result['errors']} errors, baseline {before['errors']}")
+        return regressions
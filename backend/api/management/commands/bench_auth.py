@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from api.authentication import CachedTokenAuthentication, token_cache
+from api.views import ProfileView
+
+
+class Command(BaseCommand):
+    help = "Compare authenticated requests per second with and without the token cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--phone', help="User to authenticate as (defaults to the first user with a token).")
+
+    def handle(self, *args, **options):
+        tokens = Token.objects.select_related('user')
+        token = (tokens.filter(user__phone_number=options['phone']) if options['phone'] else tokens).first()
+        if token is None:
+            raise CommandError("No token found; log in once to create one.")
+
+        factory = APIRequestFactory()
+        token_cache.clear()
+        for label, authentication in [
+            ('TokenAuthentication', TokenAuthentication),
+            ('CachedTokenAuthentication', CachedTokenAuthentication),
+        ]:
+            view = ProfileView.as_view(authentication_classes=[authentication])
+            rps, queries = self._run(view, factory, token.key, options['requests'])
+            self.stdout.write(f"{label:<28} {rps:>10.0f} req/s  {queries:.2f} queries/request")
+
+    def _run(self, view, factory, key, count):
+        view(factory.get('/profile/', HTTP_AUTHORIZATION=f'Token {key}'))  # warm up
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(count):
+                response = view(factory.get('/profile/', HTTP_AUTHORIZATION=f'Token {key}'))
+                response.render()
+            elapsed = time.perf_counter() - started
+        return count / elapsed, len(queries.captured_queries) / count
@@ -0,0 +1,87 @@
+import http.client
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ._bench import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive GET requests at running servers and compare throughput and latency, e.g. "
+        "`gunicorn Ecom.wsgi -w 4 -b :8000` against `uvicorn Ecom.asgi:application --workers 4 --port 8001`: "
+        "bench_http --target wsgi=http://127.0.0.1:8000 --target asgi=http://127.0.0.1:8001 "
+        "--path /api/v1/async/Product/"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True, help="label=base URL; repeat to compare.")
+        parser.add_argument('--path', action='append', help="Path to request; repeat to rotate through several.")
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--requests', type=int, default=5000, help="Requests per target.")
+        parser.add_argument('--header', action='append', default=[], help="Extra 'Name: value' request header.")
+
+    def handle(self, *args, **options):
+        paths = options['path'] or ['/api/v1/Product/']
+        headers = dict(header.split(':', 1) for header in options['header'])
+        headers = {name.strip(): value.strip() for name, value in headers.items()}
+
+        for target in options['target']:
+            label, _, base = target.partition('=')
+            if not base:
+                raise CommandError(f"--target must look like label=http://host:port, got {target!r}")
+            result = self.run(base, paths, headers, options['concurrency'], options['requests'])
+            self.stdout.write(
+                f"{label:<8} {result['rps']:>9.0f} req/s  "
+                f"p50 {result['p50']:.1f} ms  p95 {result['p95']:.1f} ms  p99 {result['p99']:.1f} ms  "
+                f"mean {result['mean']:.1f} ms  errors {result['errors']}"
+            )
+
+    def run(self, base, paths, headers, concurrency, total):
+        url = urlsplit(base)
+        prefix = url.path.rstrip('/')
+        latencies, errors = [], 0
+        lock = threading.Lock()
+        counter = iter(range(total))
+
+        def worker():
+            nonlocal errors
+            connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+            local, failed = [], 0
+            for index in counter:
+                started = time.perf_counter()
+                try:
+                    connection.request('GET', prefix + paths[index % len(paths)], headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status >= 400:
+                        failed += 1
+                except (OSError, http.client.HTTPException):
+                    failed += 1
+                    connection.close()
+                    connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+                local.append((time.perf_counter() - started) * 1000)
+            connection.close()
+            with lock:
+                latencies.extend(local)
+                errors += failed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(worker)
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'rps': len(latencies) / elapsed,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'mean': statistics.fmean(latencies) if latencies else 0.0,
+            'errors': errors,
+        }
@@ -0,0 +1,66 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from api.cache import bump_catalogue_version
+from api.images import IMAGE_ERRORS, build_derivatives
+from api.models import Product
+
+
+def _build(product_id, name):
+    """Runs in a worker process: only touches storage, never the database."""
+    try:
+        return product_id, build_derivatives(name), None
+    except IMAGE_ERRORS as error:
+        return product_id, None, str(error)
+
+
+class Command(BaseCommand):
+    help = "Backfill resized and WebP product image derivatives in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count).")
+        parser.add_argument('--force', action='store_true', help="Rebuild even if derivatives are up to date.")
+        parser.add_argument('--batch-size', type=int, default=200, help="Products saved per bulk_update.")
+
+    def handle(self, *args, **options):
+        products = Product.objects.exclude(product_image='').order_by('pk').values_list(
+            'pk', 'product_image', 'image_derivatives'
+        )
+        pending = [
+            (pk, name) for pk, name, derivatives in products
+            if options['force'] or (derivatives or {}).get('source') != name
+        ]
+        if not pending:
+            self.stdout.write("All product images are up to date.")
+            return
+
+        # Workers must not inherit open database connections
+        connections.close_all()
+
+        built, failed, batch = 0, 0, []
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as pool:
+            futures = [pool.submit(_build, pk, name) for pk, name in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                product_id, derivatives, error = future.result()
+                if error:
+                    failed += 1
+                    self.stderr.write(f"Product {product_id}: {error}")
+                else:
+                    batch.append(Product(pk=product_id, image_derivatives=derivatives))
+                if len(batch) >= options['batch_size']:
+                    built += self._save(batch)
+                    batch = []
+                if done % 100 == 0:
+                    self.stdout.write(f"{done}/{len(pending)} processed")
+        built += self._save(batch)
+
+        bump_catalogue_version()
+        self.stdout.write(self.style.SUCCESS(f"Built derivatives for {built} products ({failed} failed)."))
+
+    def _save(self, batch):
+        with transaction.atomic():
+            Product.objects.bulk_update(batch, ['image_derivatives'])
+        return len(batch)
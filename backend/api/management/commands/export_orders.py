@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.exports import order_csv_chunks, parse_order_filters
+
+
+class Command(BaseCommand):
+    help = "Stream orders to CSV for finance and fulfilment, in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Output file, or - for stdout.")
+        parser.add_argument('--from', dest='date_from', help="First order date to include (YYYY-MM-DD).")
+        parser.add_argument('--to', dest='date_to', help="Last order date to include (YYYY-MM-DD).")
+        parser.add_argument('--status', help="Comma-separated statuses, e.g. PROCESSING,SHIPPED.")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            filters = parse_order_filters(options['date_from'], options['date_to'], options['status'])
+        except ValueError as error:
+            raise CommandError(error)
+
+        path = options['path']
+        handle = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        try:
+            for chunk in order_csv_chunks(filters, options['chunk_size']):
+                handle.write(chunk)
+        finally:
+            if handle is not sys.stdout:
+                handle.close()
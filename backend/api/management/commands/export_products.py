@@ -0,0 +1,45 @@
+import csv
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from api.models import Product
+
+from ._product_io import FIELDS, detect_format
+
+
+class Command(BaseCommand):
+    help = "Stream every product to CSV or JSONL in constant memory (the format import_products reads)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Output file, or - for stdout.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension.")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = detect_format(path, options['format'])
+        rows = Product.objects.order_by('pk').values_list(*FIELDS).iterator(chunk_size=options['chunk_size'])
+
+        handle = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        try:
+            writer = csv.writer(handle) if file_format == 'csv' else None
+            if writer:
+                writer.writerow(FIELDS)
+            count = 0
+            for count, row in enumerate(rows, 1):
+                record = dict(zip(FIELDS, row))
+                record['product_variant'] = list(record['product_variant'])
+                record['timestamp'] = record['timestamp'].isoformat()
+                if writer:
+                    record['product_variant'] = '|'.join(record['product_variant'])
+                    writer.writerow(record.values())
+                else:
+                    handle.write(json.dumps(record) + '\n')
+                if count % 10000 == 0:
+                    self.stderr.write(f"{count} products exported")
+        finally:
+            if handle is not sys.stdout:
+                handle.close()
+        self.stderr.write(self.style.SUCCESS(f"Exported {count} products."))
@@ -0,0 +1,289 @@
+import bisect
+import itertools
+import multiprocessing
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from api.cache import bump_catalogue_version
+from api.models import (
+    Address, Cart, CustomUser, DailySales, OrderHistory, Product, ProductRating, ProductVariantPrice, Review,
+)
+
+VARIANTS = [variant for variant, _ in Product.PRODUCT_VARIANT]
+STATUS_WEIGHTS = {"PENDING": 3, "PROCESSING": 4, "SHIPPED": 8, "DELIVERED": 75, "CANCELLED": 10}
+STAR_WEIGHTS = [5, 5, 10, 30, 50]
+
+# Set in the parent before the worker pool forks, so every worker shares it
+PLAN = {}
+
+
+# -----------------------
+# Writing rows
+# -----------------------
+def write_rows(model, columns, rows):
+    """Insert tuples of `columns` with COPY on PostgreSQL, batched bulk_create elsewhere."""
+    rows = list(rows)
+    if not rows:
+        return
+    if connection.vendor == 'postgresql':
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            with cursor.copy(
+                f"COPY {quote(model._meta.db_table)} ({', '.join(quote(column) for column in columns)}) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    copy.write_row(row)
+    else:
+        model.objects.bulk_create([model(**dict(zip(columns, row))) for row in rows], batch_size=2000)
+
+
+def share(total, start, end, count):
+    """The part of `total` that falls to items [start, end) of `count`, spread evenly."""
+    return total * end // count - total * start // count
+
+
+# -----------------------
+# One chunk of users
+# -----------------------
+def generate_chunk(start, end):
+    """Users [start, end) with their addresses, carts, orders and reviews; seeded by `start` alone."""
+    plan = PLAN
+    rng = random.Random(plan['seed'] * 1_000_003 + start)
+    now, users, ids = plan['now'], plan['users'], plan['ids']
+    skus, cum_weights = plan['skus'], plan['cum_weights']
+    products = plan['products']
+
+    def pick_sku():
+        return skus[bisect.bisect(cum_weights, rng.random() * cum_weights[-1])]
+
+    def owner():
+        return rng.randrange(start, end)
+
+    user_rows, address_rows = [], []
+    for index in range(start, end):
+        user_id = ids['user'] + index
+        joined = now - timedelta(seconds=rng.randrange(3 * 365 * 24 * 3600))
+        user_rows.append((
+            user_id, plan['password'], None, False, f"6{user_id:09d}", f"user{user_id}@example.com",
+            rng.choice(plan['first_names']), rng.choice(plan['last_names']), True, False, joined,
+        ))
+        address_rows.append((
+            ids['address'] + index, ids['user'] + index, f"{rng.randint(1, 999)} Main Road", '',
+            *rng.choice(plan['places']), f"{rng.randint(110000, 855999)}",
+        ))
+
+    # Each chunk owns a fixed id range per table, so workers never collide
+    cart_rows, cart_id = [], ids['cart'] + plan['carts'] * start // users
+    for index, lines in sorted(_spread(rng, share(plan['carts'], start, end, users), start, end).items()):
+        for product_id, variant, _ in _distinct(rng, pick_sku, lines):
+            cart_rows.append((cart_id, ids['user'] + index, product_id, rng.randint(1, 5), variant))
+            cart_id += 1
+
+    order_rows, order_id = [], ids['order'] + plan['orders'] * start // users
+    statuses, status_weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+    for _ in range(share(plan['orders'], start, end, users)):
+        index = owner()
+        product_id, variant, price = pick_sku()
+        qty = rng.randint(1, 5)
+        order_date = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        status = rng.choices(statuses, status_weights)[0]
+        delivered = order_date + timedelta(days=rng.randint(1, 7)) if status == "DELIVERED" else None
+        # Prices come from the ProductVariantPrice map loaded once, not per-row model lookups
+        order_rows.append((
+            order_id, ids['user'] + index, ids['address'] + index, product_id, variant, qty,
+            order_date, delivered, status, round(price * qty, 2),
+        ))
+        order_id += 1
+
+    review_rows, review_id = [], ids['review'] + plan['reviews'] * start // users
+    for index, count in sorted(_spread(rng, share(plan['reviews'], start, end, users), start, end).items()):
+        for product_id in rng.sample(products, min(count, len(products))):
+            review_rows.append((
+                review_id, product_id, ids['user'] + index, str(rng.choices(range(1, 6), STAR_WEIGHTS)[0]),
+                'Synthetic review.', now - timedelta(seconds=rng.randrange(365 * 24 * 3600)),
+            ))
+            review_id += 1
+
+    with transaction.atomic():
+        write_rows(CustomUser, ['id', 'password', 'last_login', 'is_superuser', 'phone_number', 'email',
+                                'first_name', 'last_name', 'is_active', 'is_staff', 'date_joined'], user_rows)
+        write_rows(Address, ['id', 'user_id', 'address_lane1', 'address_landmark', 'address_city',
+                             'address_district', 'address_state', 'address_pincode'], address_rows)
+        write_rows(Cart, ['id', 'user_id', 'product_id', 'qty', 'variant'], cart_rows)
+        write_rows(OrderHistory, ['id', 'user_id', 'address_id', 'product_id', 'variant', 'qty',
+                                  'order_date', 'delivery_date', 'status', 'bill_amount'], order_rows)
+        write_rows(Review, ['id', 'product_id', 'user_id', 'star', 'content', 'created_at'], review_rows)
+    return end - start, len(cart_rows), len(order_rows), len(review_rows)
+
+
+def _spread(rng, total, start, end):
+    """Hand `total` items to random users in [start, end): {user index: count}."""
+    counts = {}
+    for _ in range(total):
+        index = rng.randrange(start, end)
+        counts[index] = counts.get(index, 0) + 1
+    return counts
+
+
+def _distinct(rng, pick, count, attempts=20):
+    """Up to `count` different SKUs, as cart lines must be unique per user."""
+    chosen = {}
+    for _ in range(count * attempts):
+        if len(chosen) == count:
+            break
+        sku = pick()
+        chosen.setdefault(sku[:2], sku)
+    return chosen.values()
+
+
+def _run_chunk(bounds):
+    try:
+        return generate_chunk(*bounds)
+    finally:
+        connections.close_all()
+
+
+# -----------------------
+# Command
+# -----------------------
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic dataset at scale: users (one precomputed password "
+        "hash), addresses, carts, orders and reviews, plus products if asked. Rows are written "
+        "with COPY on PostgreSQL (bulk_create elsewhere) by several worker processes; the same "
+        "--seed and --as-of on the same starting database always produce the same rows. Without "
+        "--as-of, timestamps are offset from the current time and differ between runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--orders', type=int, default=1_000_000)
+        parser.add_argument('--reviews', type=int, default=200_000)
+        parser.add_argument('--carts', type=int, default=100_000, help="Cart lines.")
+        parser.add_argument('--products', type=int, default=0, help="New products to add first.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--as-of', dest='as_of',
+                            help="Reference time the generated dates count back from (YYYY-MM-DD or an ISO "
+                                 "datetime); default: now.")
+        parser.add_argument('--password', default='synthetic-password', help="Password for every generated user.")
+        parser.add_argument('--chunk-size', type=int, default=10_000, help="Users per worker task.")
+        parser.add_argument('--processes', type=int,
+                            help="Worker processes; default: one per CPU on PostgreSQL, 1 elsewhere.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rng = random.Random(options['seed'])
+        now = self._as_of(options['as_of']) if options['as_of'] else timezone.now()
+        if options['products']:
+            self.create_products(options['products'], rng, now)
+
+        skus = [
+            (product_id, variant, float(price))
+            for product_id, variant, price in ProductVariantPrice.objects.order_by('product_id', 'variant')
+            .values_list('product_id', 'variant', 'price')
+        ]
+        if not skus:
+            raise CommandError("No priced products; pass --products to create some.")
+        # A Zipf-like popularity curve: a few SKUs sell far more than the rest
+        weights = [1 / rank for rank in range(1, len(skus) + 1)]
+        rng.shuffle(skus)
+
+        ids = {
+            name: (model.objects.aggregate(top=Max('id'))['top'] or 0) + 1
+            for name, model in [('user', CustomUser), ('address', Address), ('cart', Cart),
+                                ('order', OrderHistory), ('review', Review)]
+        }
+        PLAN.update(
+            seed=options['seed'], now=now, users=options['users'], ids=ids,
+            orders=options['orders'], reviews=options['reviews'], carts=options['carts'],
+            skus=skus, cum_weights=list(itertools.accumulate(weights)),
+            products=sorted({product_id for product_id, _, _ in skus}),
+            password=make_password(options['password']),
+            first_names=['Aarav', 'Vivaan', 'Aditya', 'Ananya', 'Diya', 'Ishaan', 'Kavya', 'Riya', 'Rohan', 'Saanvi'],
+            last_names=['Sharma', 'Verma', 'Gupta', 'Singh', 'Shekhawat', 'Rathore', 'Jain', 'Agarwal', 'Mehta'],
+            places=[('Jaipur', 'Jaipur', 'Rajasthan'), ('Sikar', 'Sikar', 'Rajasthan'),
+                    ('Jhunjhunu', 'Jhunjhunu', 'Rajasthan'), ('Delhi', 'New Delhi', 'Delhi'),
+                    ('Mumbai', 'Mumbai', 'Maharashtra'), ('Pune', 'Pune', 'Maharashtra')],
+        )
+
+        users, size = options['users'], options['chunk_size']
+        chunks = [(start, min(start + size, users)) for start in range(0, users, size)]
+        processes = options['processes'] or (os.cpu_count() if connection.vendor == 'postgresql' else 1)
+        totals = [0, 0, 0, 0]
+
+        if processes > 1:
+            # Forked workers inherit PLAN; each opens its own connection. A pool's
+            # worker threads do not survive a fork, so it is closed too.
+            connections.close_all()
+            if connection.vendor == 'postgresql':
+                connection.close_pool()
+            with multiprocessing.get_context('fork').Pool(processes) as pool:
+                for done in pool.imap_unordered(_run_chunk, chunks):
+                    totals = self.progress(totals, done, users)
+        else:
+            for bounds in chunks:
+                totals = self.progress(totals, generate_chunk(*bounds), users)
+
+        self.stdout.write("Resetting sequences and rebuilding rating and sales summaries...")
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [CustomUser, Address, Cart, OrderHistory, Review]):
+                cursor.execute(sql)
+        ProductRating.objects.rebuild()
+        DailySales.objects.rebuild()
+        # Bulk inserts send no signals: drop cached catalogue pages with the old products and ratings
+        bump_catalogue_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {totals[0]} users and addresses, {totals[1]} cart lines, {totals[2]} orders "
+            f"and {totals[3]} reviews in {time.perf_counter() - started:.1f}s."
+        ))
+
+    def _as_of(self, value):
+        """A date (midnight) or datetime, in the current time zone unless it names one."""
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                raise CommandError("--as-of must be a date like 2025-01-31 or an ISO datetime")
+            moment = datetime.combine(day, datetime.min.time())
+        return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+    def progress(self, totals, done, users):
+        totals = [total + count for total, count in zip(totals, done)]
+        self.stdout.write(f"  {totals[0]}/{users} users")
+        return totals
+
+    def create_products(self, count, rng, now):
+        """Products and their variant prices, priced in one pass."""
+        products = Product.objects.bulk_create(
+            [
+                Product(
+                    product_name=f"Synthetic {rng.choice(['Bhujia', 'Namkeen', 'Mathri', 'Papad', 'Achar', 'Ghevar'])} {index}",
+                    product_desc='Synthetic product for scale testing.',
+                    product_variant=sorted(rng.sample(VARIANTS, rng.randint(1, len(VARIANTS))), key=VARIANTS.index),
+                    product_mrp=round(rng.uniform(20, 500), 2),
+                    timestamp=now,
+                )
+                for index in range(count)
+            ],
+            batch_size=2000,
+        )
+        ProductVariantPrice.objects.bulk_create(
+            [
+                ProductVariantPrice(product=product, variant=variant, price=Product.variant_price(product.product_mrp, variant))
+                for product in products
+                for variant in product.product_variant
+            ],
+            batch_size=2000,
+        )
+        self.stdout.write(f"Created {len(products)} products.")
@@ -0,0 +1,160 @@
+import json
+import math
+import os
+import shutil
+import time
+from itertools import islice
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from django.utils.dateparse import parse_datetime
+
+from api.cache import bump_catalogue_version
+from api.models import Product, ProductRating, ProductVariantPrice
+
+from ._product_io import detect_format, parse_variants, read_rows
+
+UPDATE_FIELDS = ['product_name', 'product_desc', 'product_variant', 'product_mrp', 'product_image', 'timestamp']
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream products from CSV or JSONL into the catalogue in chunks. Rows with an `id` "
+        "update that product; rows without one are created. Invalid rows go to an error file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file (columns as written by export_products).")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension.")
+        parser.add_argument('--images-dir', help="Directory that product_image file names are resolved against.")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--errors', help="Where to write rejected rows (default: <path>.errors.jsonl).")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist.")
+
+        self.images_dir = options['images_dir']
+        file_format = detect_format(path, options['format'])
+        errors_path = options['errors'] or f'{path}.errors.jsonl'
+        started = time.monotonic()
+        created = updated = rejected = 0
+
+        with open(path, newline='', encoding='utf-8') as handle, open(errors_path, 'w', encoding='utf-8') as errors:
+            rows = read_rows(handle, file_format)
+            while chunk := list(islice(rows, options['chunk_size'])):
+                valid = []
+                for line_number, row, error in chunk:
+                    try:
+                        if error:
+                            raise ValueError(error)
+                        valid.append((line_number, row, self.build_product(row)))
+                    except (ValueError, TypeError, OSError, OverflowError) as error:
+                        rejected += 1
+                        errors.write(json.dumps({'line': line_number, 'error': str(error), 'row': row}) + '\n')
+
+                try:
+                    results = [self.write_chunk([product for _, _, product in valid])]
+                except DatabaseError:
+                    # The chunk was rolled back: write it row by row so only the bad rows are rejected
+                    results = []
+                    for line_number, row, _ in valid:
+                        try:
+                            results.append(self.write_chunk([self.build_product(row)]))
+                        except DatabaseError as error:
+                            rejected += 1
+                            errors.write(json.dumps({'line': line_number, 'error': str(error).strip(), 'row': row}) + '\n')
+
+                for chunk_created, chunk_updated, missing in results:
+                    created += chunk_created
+                    updated += chunk_updated
+                    for pk in missing:
+                        rejected += 1
+                        errors.write(json.dumps({'id': pk, 'error': "no product with this id"}) + '\n')
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"{created + updated + rejected} rows: {created} created, {updated} updated, "
+                    f"{rejected} rejected ({(created + updated) / max(elapsed, 1e-6):.0f} rows/s)"
+                )
+
+        bump_catalogue_version()
+        if not rejected:
+            os.remove(errors_path)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {created + updated} products ({created} created, {updated} updated)."
+            + (f" {rejected} rows rejected, see {errors_path}." if rejected else "")
+        ))
+        if created or updated:
+            self.stdout.write("Run build_image_derivatives to generate resized images for new uploads.")
+
+    def build_product(self, row):
+        name = (row.get('product_name') or '').strip()
+        if not name or len(name) > 50:
+            raise ValueError("product_name is required and must be at most 50 characters")
+        mrp = float(row.get('product_mrp') or 0)
+        # NaN and infinity would pass a plain `mrp <= 0`
+        if not math.isfinite(mrp) or mrp <= 0:
+            raise ValueError("product_mrp must be a positive number")
+
+        product = Product(
+            product_name=name,
+            product_desc=row.get('product_desc') or '',
+            product_variant=parse_variants(row.get('product_variant')),
+            product_mrp=mrp,
+            product_image=self.resolve_image(row.get('product_image') or ''),
+        )
+        if row.get('id'):
+            product.pk = int(row['id'])
+            if not 0 < product.pk < 2 ** 63:
+                raise ValueError(f"invalid id {row['id']!r}")
+        if row.get('timestamp'):
+            product.timestamp = parse_datetime(row['timestamp'])
+            if product.timestamp is None:
+                raise ValueError(f"invalid timestamp {row['timestamp']!r}")
+        return product
+
+    def resolve_image(self, name):
+        """Copy a local file into media storage; names already in storage are kept as they are."""
+        max_length = Product._meta.get_field('product_image').max_length
+        if not name or not self.images_dir or default_storage.exists(name):
+            if len(name) > max_length:
+                raise ValueError(f"product_image must be at most {max_length} characters")
+            return name
+        source = os.path.join(self.images_dir, name)
+        if not os.path.isfile(source):
+            raise ValueError(f"image {name!r} not found in {self.images_dir}")
+        target = f'ecom/images/{os.path.basename(name)}'
+        if len(target) > max_length:
+            raise ValueError(f"product_image must be at most {max_length} characters")
+        if default_storage.exists(target):
+            return target
+        with open(source, 'rb') as image:
+            return default_storage.save(target, File(image))
+
+    @transaction.atomic
+    def write_chunk(self, products):
+        """Insert/update one chunk and derive its prices and rating rows in batch."""
+        existing_ids = set(
+            Product.objects.filter(pk__in=[p.pk for p in products if p.pk]).values_list('pk', flat=True)
+        )
+        missing = [p.pk for p in products if p.pk and p.pk not in existing_ids]
+        to_update = [p for p in products if p.pk in existing_ids]
+        to_create = [p for p in products if not p.pk]
+
+        Product.objects.bulk_update(to_update, UPDATE_FIELDS)
+        Product.objects.bulk_create(to_create)
+
+        # Prices and rating summaries that Product.save()/signals would have written
+        ProductVariantPrice.objects.filter(product_id__in=existing_ids).delete()
+        ProductVariantPrice.objects.bulk_create([
+            ProductVariantPrice(product=product, variant=variant, price=Product.variant_price(product.product_mrp, variant))
+            for product in to_update + to_create
+            for variant in product.product_variant
+        ])
+        ProductRating.objects.bulk_create([ProductRating(product=product) for product in to_create], ignore_conflicts=True)
+
+        return len(to_create), len(to_update), missing
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import bump_catalogue_version
+from api.models import ProductRating
+
+
+class Command(BaseCommand):
+    help = "Rebuild every product rating summary from the Review table in one set-based pass."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rebuilt = ProductRating.objects.rebuild(batch_size=options['batch_size'])
+        bump_catalogue_version()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} rating summaries."))
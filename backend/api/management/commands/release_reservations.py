@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.models import StockReservation
+
+
+class Command(BaseCommand):
+    help = "Return the stock held by expired checkout reservations. Run it every minute or so from cron."
+
+    def handle(self, *args, **options):
+        released = StockReservation.objects.release_expired()
+        self.stdout.write(self.style.SUCCESS(f"Released {released} expired reservations."))
@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Cast, Round
+
+from api.cache import bump_catalogue_version
+from api.models import Product, ProductVariantPrice
+
+
+class Command(BaseCommand):
+    help = (
+        "Change the MRP of many products at once and re-derive their variant prices "
+        "with set-based UPDATEs instead of one save() per product."
+    )
+
+    def add_arguments(self, parser):
+        change = parser.add_mutually_exclusive_group(required=True)
+        change.add_argument('--percent', type=Decimal, help="Raise (or, if negative, cut) the MRP by this percentage.")
+        change.add_argument('--set-mrp', type=float, help="Set the MRP to this value.")
+
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--ids', type=lambda value: [int(pk) for pk in value.split(',')], help="Comma-separated product ids.")
+        target.add_argument('--name-contains', help="Products whose name contains this text.")
+        target.add_argument('--all', action='store_true', help="Every product.")
+
+        parser.add_argument('--dry-run', action='store_true', help="Report how many products match and stop.")
+
+    def handle(self, *args, **options):
+        products = Product.objects.order_by()
+        if options['ids']:
+            products = products.filter(pk__in=options['ids'])
+        elif options['name_contains']:
+            products = products.filter(product_name__icontains=options['name_contains'])
+
+        matched = products.count()
+        if options['dry_run']:
+            self.stdout.write(f"{matched} products would be repriced.")
+            return
+        if not matched:
+            raise CommandError("No products match.")
+
+        if options['percent'] is not None:
+            factor = 1 + float(options['percent']) / 100
+            if factor <= 0:
+                raise CommandError("--percent must be greater than -100.")
+            # ROUND(x, 2) needs numeric on PostgreSQL, not double precision
+            mrp = Round(Cast(F('product_mrp') * factor, DecimalField(max_digits=12, decimal_places=4)), 2)
+        else:
+            mrp = Value(options['set_mrp'])
+
+        price_of_variant = Case(
+            *(
+                When(variant=variant, then=Value(multiplier))
+                for variant, multiplier in Product.VARIANT_MULTIPLIER.items()
+            )
+        )
+        new_price = Round(
+            Cast(
+                Subquery(Product.objects.filter(pk=OuterRef('product_id')).values('product_mrp')[:1]),
+                DecimalField(max_digits=12, decimal_places=4),
+            ) * price_of_variant,
+            2,
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        )
+
+        with transaction.atomic():
+            updated = products.update(product_mrp=mrp)
+            prices = ProductVariantPrice.objects.filter(product__in=products.values('pk')).update(price=new_price)
+
+        transaction.on_commit(bump_catalogue_version)
+        self.stdout.write(self.style.SUCCESS(f"Repriced {updated} products ({prices} variant prices)."))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from api.models import DailySales
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill or reconcile the DailySales rollup against OrderHistory. Without --check "
+        "the rows in the day range are rebuilt; with --check they are only compared."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='day_from', help="First day (YYYY-MM-DD); default: the beginning.")
+        parser.add_argument('--to', dest='day_to', help="Last day (YYYY-MM-DD); default: today.")
+        parser.add_argument('--check', action='store_true', help="Report drift and exit non-zero if any is found.")
+
+    def handle(self, *args, **options):
+        day_from, day_to = (self._date(options[name], name) for name in ('day_from', 'day_to'))
+
+        if not options['check']:
+            rebuilt = DailySales.objects.rebuild(day_from, day_to)
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} rollup rows."))
+            return
+
+        key = lambda row: (row.day, row.product_id, row.variant, row.status)  # noqa: E731
+        expected = {key(row): (row.orders, row.units, row.revenue) for row in DailySales.objects.from_orders(day_from, day_to)}
+        stored = DailySales.objects.all()
+        if day_from:
+            stored = stored.filter(day__gte=day_from)
+        if day_to:
+            stored = stored.filter(day__lte=day_to)
+        actual = {key(row): (row.orders, row.units, row.revenue) for row in stored.iterator() if row.orders or row.units}
+
+        drift = sorted(set(expected) | set(actual), key=str)
+        drift = [k for k in drift if expected.get(k, (0, 0, 0)) != actual.get(k, (0, 0, 0))]
+        for k in drift[:50]:
+            self.stdout.write(f"{k}: expected {expected.get(k)} stored {actual.get(k)}")
+        if drift:
+            raise CommandError(f"{len(drift)} rollup rows drifted; run rollup_sales without --check to rebuild.")
+        self.stdout.write(self.style.SUCCESS(f"{len(expected)} rollup rows match OrderHistory."))
+
+    def _date(self, value, name):
+        if not value:
+            return None
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"--{name.split('_')[1]} must be a date like 2025-01-31")
+        return day
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Sum
+
+from api.models import Product, ProductStock
+
+
+class Command(BaseCommand):
+    help = (
+        "Set the units on hand for a product variant. --shards splits a hot variant's "
+        "stock over several rows so concurrent checkouts do not queue on one row lock."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('product_id', type=int)
+        parser.add_argument('variant')
+        parser.add_argument('stock', type=int)
+        parser.add_argument('--shards', type=int, default=1)
+
+    def handle(self, *args, **options):
+        product_id, variant = options['product_id'], options['variant']
+        if not Product.objects.filter(pk=product_id).exists():
+            raise CommandError(f"Product {product_id} does not exist.")
+        if variant not in dict(Product.PRODUCT_VARIANT):
+            raise CommandError(f"Unknown variant {variant!r}; expected one of {list(dict(Product.PRODUCT_VARIANT))}")
+        if options['stock'] < 0 or not 1 <= options['shards'] <= options['stock'] + 1:
+            raise CommandError("stock must be 0 or more and --shards between 1 and stock + 1.")
+
+        ProductStock.objects.set_stock(product_id, variant, options['stock'], options['shards'])
+        total = ProductStock.objects.filter(product_id=product_id, variant=variant).aggregate(total=Sum('stock'))['total']
+        self.stdout.write(self.style.SUCCESS(
+            f"Product {product_id} ({variant}): {total} in stock over {options['shards']} shard(s)."
+        ))
@@ -0,0 +1,262 @@
+import bisect
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds: request latency in seconds, and SQL queries per request
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+# -----------------------
+# Per-route histograms
+# -----------------------
+class RouteStats:
+    __slots__ = ('latency', 'latency_sum', 'queries', 'query_sum', 'db_sum', 'count', 'statuses')
+
+    def __init__(self):
+        # One slot per bucket plus +Inf; counts are per bucket and made cumulative on export
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.queries = [0] * (len(QUERY_BUCKETS) + 1)
+        self.latency_sum = self.query_sum = self.db_sum = 0.0
+        self.count = 0
+        self.statuses = {}
+
+
+class MetricsRegistry:
+    """
+    In-process request metrics, rendered in the Prometheus text format. Each
+    worker process keeps its own, so scrape every worker (or sum them).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, route, method, status, seconds, db_seconds, queries):
+        with self._lock:
+            stats = self._routes.get((route, method))
+            if stats is None:
+                stats = self._routes[(route, method)] = RouteStats()
+            stats.latency[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            stats.queries[bisect.bisect_left(QUERY_BUCKETS, queries)] += 1
+            stats.latency_sum += seconds
+            stats.query_sum += queries
+            stats.db_sum += db_seconds
+            stats.count += 1
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render(self):
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = [
+                '# HELP http_request_duration_seconds Request latency by route.',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for (route, method), stats in routes:
+                lines += _histogram('http_request_duration_seconds', _labels(route, method), LATENCY_BUCKETS,
+                                    stats.latency, stats.latency_sum, stats.count)
+
+            lines += [
+                '# HELP http_request_db_queries SQL queries per request by route.',
+                '# TYPE http_request_db_queries histogram',
+            ]
+            for (route, method), stats in routes:
+                lines += _histogram('http_request_db_queries', _labels(route, method), QUERY_BUCKETS,
+                                    stats.queries, stats.query_sum, stats.count)
+
+            lines += [
+                '# HELP http_request_db_seconds_total Time spent in SQL by route.',
+                '# TYPE http_request_db_seconds_total counter',
+            ]
+            lines += [
+                f'http_request_db_seconds_total{{{_labels(route, method)}}} {stats.db_sum:.6f}'
+                for (route, method), stats in routes
+            ]
+
+            lines += [
+                '# HELP http_responses_total Responses by route and status code.',
+                '# TYPE http_responses_total counter',
+            ]
+            for (route, method), stats in routes:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'http_responses_total{{{_labels(route, method)},status="{status}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(route, method):
+    route = route.replace('\\', '\\\\').replace('"', '\\"')
+    return f'route="{route}",method="{method}"'
+
+
+def _histogram(name, labels, bounds, counts, total, count):
+    lines, cumulative = [], 0
+    for bound, bucket in zip((*bounds, '+Inf'), counts):
+        cumulative += bucket
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_sum{{{labels}}} {total:.6f}')
+    lines.append(f'{name}_count{{{labels}}} {count}')
+    return lines
+
+
+registry = MetricsRegistry()
+
+
+# -----------------------
+# Per-request timer
+# -----------------------
+# The current request's timer; sync_to_async copies it into the threads the async ORM runs in
+_timer = ContextVar('request_timer', default=None)
+
+
+class RequestTimer:
+    """Counts and times a request's SQL, serialization and rendering."""
+    __slots__ = ('queries', 'db', 'sql', 'serialize', 'serializing', 'render', 'render_started')
+
+    def __init__(self, keep_sql=False):
+        self.queries = 0
+        self.db = self.serialize = self.render = 0.0
+        self.serializing = False
+        self.render_started = None
+        # Statements are only kept for sampled requests, for the slow-request log
+        self.sql = [] if keep_sql else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db += elapsed
+            if self.sql is not None:
+                self.sql.append((elapsed, sql))
+
+    def rendered(self, response):
+        self.render = time.perf_counter() - self.render_started
+
+
+def time_query(execute, sql, params, many, context):
+    """
+    The one execute_wrapper every connection gets (api.signals installs it);
+    it times the query for whichever request is running in this context.
+    """
+    timer = _timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+@contextmanager
+def timing_serialization():
+    """Count the block as the current request's serializer time, less its SQL."""
+    timer = _timer.get()
+    # Nested serializers run inside their parent's block
+    if timer is None or timer.serializing:
+        yield
+        return
+    timer.serializing = True
+    started, db = time.perf_counter(), timer.db
+    try:
+        yield
+    finally:
+        timer.serialize += time.perf_counter() - started - (timer.db - db)
+        timer.serializing = False
+
+
+class TimedSerializerMixin:
+    """Serializer mixin: to_representation counts as serializer time in Server-Timing."""
+
+    def to_representation(self, instance):
+        with timing_serialization():
+            return super().to_representation(instance)
+
+
+# -----------------------
+# Middleware
+# -----------------------
+class PerformanceMiddleware:
+    """
+    Time every request and add a Server-Timing header: SQL (count and time),
+    serializer, app (the rest of the view), template/DRF render, and total. Timings go
+    into the per-route histograms served by MetricsView; a sample of slow
+    requests is logged with their slowest queries.
+    Streaming bodies are timed up to the first byte.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timer = self.start(request)
+        started = time.perf_counter()
+        token = _timer.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            _timer.reset(token)
+        return self.finish(request, response, timer, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        timer = self.start(request)
+        started = time.perf_counter()
+        # Each request runs in its own context, so concurrent requests never share a timer
+        token = _timer.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timer.reset(token)
+        return self.finish(request, response, timer, time.perf_counter() - started)
+
+    def process_template_response(self, request, response):
+        # Runs just before DRF/template rendering; the callback runs just after it
+        timer = getattr(request, '_performance_timer', None)
+        if timer is not None:
+            timer.render_started = time.perf_counter()
+            response.add_post_render_callback(timer.rendered)
+        return response
+
+    def start(self, request):
+        timer = RequestTimer(keep_sql=random.random() < settings.PERF_SLOW_LOG_SAMPLE_RATE)
+        request._performance_timer = timer
+        return timer
+
+    def finish(self, request, response, timer, total):
+        app = max(0.0, total - timer.db - timer.serialize - timer.render)
+        response['Server-Timing'] = (
+            f'db;dur={timer.db * 1000:.1f};desc="{timer.queries} queries", '
+            f'serialize;dur={timer.serialize * 1000:.1f}, app;dur={app * 1000:.1f}, '
+            f'render;dur={timer.render * 1000:.1f}, total;dur={total * 1000:.1f}'
+        )
+
+        match = request.resolver_match
+        route = (match.view_name or match.route) if match else 'unmatched'
+        registry.observe(route, request.method, response.status_code, total, timer.db, timer.queries)
+
+        if timer.sql is not None and total * 1000 >= settings.PERF_SLOW_REQUEST_MS:
+            slowest = sorted(timer.sql, key=lambda query: query[0], reverse=True)[:5]
+            logger.warning(
+                "Slow request %s %s: %.0f ms, %d queries in %.0f ms; slowest:\n%s",
+                request.method, request.get_full_path(), total * 1000, timer.queries, timer.db * 1000,
+                '\n'.join(f'  {elapsed * 1000:.1f} ms  {sql[:300]}' for elapsed, sql in slowest),
+            )
+        return response
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:39
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_cart_lines(apps, schema_editor):
+    """Fold duplicate (user, product, variant) lines into one before constraining."""
+    Cart = apps.get_model('api', 'Cart')
+    duplicates = (
+        Cart.objects.values('user', 'product', 'variant')
+        .annotate(lines=Count('id'), keep=Min('id'), total=Sum('qty'))
+        .filter(lines__gt=1)
+    )
+    for line in duplicates:
+        Cart.objects.filter(pk=line['keep']).update(qty=line['total'])
+        Cart.objects.filter(
+            user=line['user'], product=line['product'], variant=line['variant']
+        ).exclude(pk=line['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_alter_address_options_alter_cart_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_cart_lines, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cart',
+            constraint=models.UniqueConstraint(fields=('user', 'product', 'variant'), name='unique_cart_line'),
+        ),
+    ]
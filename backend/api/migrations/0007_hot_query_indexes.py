@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_cart_unique_line'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['email'], name='user_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderhistory',
+            index=models.Index(fields=['user', '-order_date', '-id'], name='order_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderhistory',
+            index=models.Index(condition=models.Q(('status__in', ['DELIVERED', 'CANCELLED']), _negated=True), fields=['status', 'order_date'], name='order_open_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['product_name', 'id'], name='product_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', '-created_at', '-id'], name='review_product_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['-created_at', '-id'], name='review_created_idx'),
+        ),
+    ]
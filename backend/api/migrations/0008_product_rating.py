@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Q, Sum
+from django.db.models.functions import Cast, Coalesce
+
+
+def backfill_ratings(apps, schema_editor):
+    """Summarize existing reviews, one row per product."""
+    Product = apps.get_model('api', 'Product')
+    ProductRating = apps.get_model('api', 'ProductRating')
+    rows = Product.objects.order_by().annotate(
+        review_count=Count('review'),
+        review_total=Coalesce(Sum(Cast('review__star', IntegerField())), 0),
+        **{f'review_star_{star}': Count('review', filter=Q(review__star=str(star))) for star in range(1, 6)},
+    ).values_list('id', 'review_count', 'review_total', *(f'review_star_{star}' for star in range(1, 6)))
+    ProductRating.objects.bulk_create(
+        [
+            ProductRating(
+                product_id=product_id, count=count, total=total,
+                star_1=stars[0], star_2=stars[1], star_3=stars[2], star_4=stars[3], star_5=stars[4],
+                average=total / count if count else 0.0,
+            )
+            for product_id, count, total, *stars in rows.iterator(chunk_size=1000)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductRating',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating', serialize=False, to='api.product')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('star_1', models.PositiveIntegerField(default=0)),
+                ('star_2', models.PositiveIntegerField(default=0)),
+                ('star_3', models.PositiveIntegerField(default=0)),
+                ('star_4', models.PositiveIntegerField(default=0)),
+                ('star_5', models.PositiveIntegerField(default=0)),
+                ('average', models.FloatField(default=0.0)),
+            ],
+            options={
+                'verbose_name_plural': 'Product Ratings',
+                'indexes': [models.Index(fields=['-average', '-product'], name='rating_average_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
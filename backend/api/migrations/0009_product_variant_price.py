@@ -0,0 +1,79 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:42
+
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import groupby
+from operator import itemgetter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+# Product.PRODUCT_VARIANT order, in which save() used to write product_price_data
+VARIANTS = ['100g', '200g', '500g', '1kg', '2kg', '5kg']
+
+
+def copy_price_data(apps, schema_editor):
+    """Move each product's product_price_data JSON into ProductVariantPrice rows."""
+    Product = apps.get_model('api', 'Product')
+    ProductVariantPrice = apps.get_model('api', 'ProductVariantPrice')
+    rows = []
+    for product_id, price_data in Product.objects.order_by().values_list('id', 'product_price_data').iterator(chunk_size=BATCH_SIZE):
+        rows += [
+            ProductVariantPrice(
+                product_id=product_id,
+                variant=variant,
+                price=Decimal(str(price)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+            )
+            for variant, price in (price_data or {}).items()
+        ]
+        if len(rows) >= BATCH_SIZE:
+            ProductVariantPrice.objects.bulk_create(rows)
+            rows = []
+    ProductVariantPrice.objects.bulk_create(rows)
+
+
+def restore_price_data(apps, schema_editor):
+    """Rebuild product_price_data from the ProductVariantPrice rows before they are dropped."""
+    Product = apps.get_model('api', 'Product')
+    ProductVariantPrice = apps.get_model('api', 'ProductVariantPrice')
+    prices = (
+        ProductVariantPrice.objects.order_by('product_id')
+        .values_list('product_id', 'variant', 'price').iterator(chunk_size=BATCH_SIZE)
+    )
+    products = []
+    for product_id, rows in groupby(prices, key=itemgetter(0)):
+        rows = sorted(rows, key=lambda row: VARIANTS.index(row[1]) if row[1] in VARIANTS else len(VARIANTS))
+        products.append(Product(id=product_id, product_price_data={variant: float(price) for _, variant, price in rows}))
+        if len(products) >= BATCH_SIZE:
+            Product.objects.bulk_update(products, ['product_price_data'])
+            products = []
+    Product.objects.bulk_update(products, ['product_price_data'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_product_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductVariantPrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('variant', models.CharField(choices=[('100g', '100g'), ('200g', '200g'), ('500g', '500g'), ('1kg', '1kg'), ('2kg', '2kg'), ('5kg', '5kg')], max_length=10)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prices', to='api.product')),
+            ],
+            options={
+                'verbose_name_plural': 'Product Variant Prices',
+                'indexes': [models.Index(fields=['variant', 'price'], name='variant_price_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'variant'), name='unique_product_variant_price')],
+            },
+        ),
+        migrations.RunPython(copy_price_data, restore_price_data),
+        migrations.RemoveField(
+            model_name='product',
+            name='product_price_data',
+        ),
+    ]
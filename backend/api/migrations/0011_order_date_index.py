@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_product_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orderhistory',
+            index=models.Index(fields=['order_date', 'id'], name='order_date_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:48
+
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_sales(apps, schema_editor):
+    OrderHistory = apps.get_model('api', 'OrderHistory')
+    DailySales = apps.get_model('api', 'DailySales')
+    rows = (
+        OrderHistory.objects.order_by()
+        .annotate(day=TruncDate('order_date'))
+        .values('day', 'product_id', 'variant', 'status')
+        .annotate(order_count=Count('id'), unit_count=Sum('qty'), revenue_total=Sum('bill_amount'))
+    )
+    DailySales.objects.bulk_create(
+        [
+            DailySales(
+                day=row['day'], product_id=row['product_id'], variant=row['variant'], status=row['status'],
+                orders=row['order_count'], units=row['unit_count'],
+                revenue=Decimal(str(row['revenue_total'])).quantize(Decimal('0.01')),
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_order_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('variant', models.CharField(max_length=10)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('SHIPPED', 'Shipped'), ('DELIVERED', 'Delivered'), ('CANCELLED', 'Cancelled')], max_length=20)),
+                ('orders', models.IntegerField(default=0)),
+                ('units', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='api.product')),
+            ],
+            options={
+                'verbose_name_plural': 'Daily Sales',
+                'ordering': ['-day'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'product', 'variant', 'status'), name='unique_daily_sales')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_sales, migrations.RunPython.noop),
+    ]
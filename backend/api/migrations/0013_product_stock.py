@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_daily_sales'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('variant', models.CharField(choices=[('100g', '100g'), ('200g', '200g'), ('500g', '500g'), ('1kg', '1kg'), ('2kg', '2kg'), ('5kg', '5kg')], max_length=10)),
+                ('shard', models.PositiveSmallIntegerField(default=0)),
+                ('stock', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock', to='api.product')),
+            ],
+            options={
+                'verbose_name_plural': 'Product Stock',
+                'constraints': [models.UniqueConstraint(fields=('product', 'variant', 'shard'), name='unique_product_stock_shard')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('variant', models.CharField(max_length=10)),
+                ('qty', models.PositiveIntegerField()),
+                ('expires_at', models.DateTimeField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.product')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_reservations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Stock Reservations',
+                'indexes': [models.Index(fields=['expires_at'], name='reservation_expiry_idx')],
+            },
+        ),
+    ]
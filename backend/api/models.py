@@ -1,8 +1,18 @@
-from django.db import models
+import logging
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import islice
+
+from django.db import connections, models, router, transaction
+from django.db.models import Count, F, FloatField, IntegerField, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Now, NullIf, TruncDate
 from django.utils import timezone
 from django.conf import settings
 from multiselectfield import MultiSelectField
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
+from .images import IMAGE_ERRORS, build_derivatives
+
+logger = logging.getLogger(__name__)
 
 
 # -----------------------
@@ -57,6 +67,9 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         verbose_name = "User"
         verbose_name_plural = "Users"
         ordering = ['-date_joined']
+        indexes = [
+            models.Index(fields=['email'], name='user_email_idx'),
+        ]
 
 
 # -----------------------
@@ -72,31 +85,77 @@ class Product(models.Model):
         ("5kg", "5kg"),
     ]
 
+    # Price of each variant as a multiple of the MRP (which is per 100g)
+    VARIANT_MULTIPLIER = {
+        "100g": 1,
+        "200g": 2,
+        "500g": 5,
+        "1kg": 10,
+        "2kg": 20,
+        "5kg": 50,
+    }
+
     product_name = models.CharField(max_length=50)
     product_desc = models.TextField(blank=True)
     product_image = models.ImageField(upload_to='ecom/images/', default='')
     product_variant = MultiSelectField(choices=PRODUCT_VARIANT)
     product_mrp = models.FloatField(default=100)
-    product_price_data = models.JSONField(default=dict, blank=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     timestamp = models.DateTimeField(default=timezone.now)
 
     def save(self, *args, **kwargs):
-        conversion = {
-            "100g": 1,
-            "200g": 2,
-            "500g": 5,
-            "1kg": 10,
-            "2kg": 20,
-            "5kg": 50,
-        }
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.sync_prices()
+            # Resizing is slow: do it after commit instead of holding the row lock
+            transaction.on_commit(self.sync_image_derivatives)
+
+    def sync_image_derivatives(self):
+        """Rebuild the resized/WebP copies when a new image has been uploaded."""
+        name = self.product_image.name or ''
+        if self.image_derivatives.get('source', '') == name:
+            return
+        try:
+            self.image_derivatives = build_derivatives(name) if name else {}
+        except IMAGE_ERRORS:
+            logger.warning("Could not build image derivatives for %s", name, exc_info=True)
+            self.image_derivatives = {}
+        # Skip the write if another save has replaced the image in the meantime
+        Product.objects.filter(pk=self.pk, product_image=name).update(image_derivatives=self.image_derivatives)
+
+    def sync_prices(self):
+        """Write one ProductVariantPrice row per offered variant and drop the rest."""
+        prices = [
+            ProductVariantPrice(product=self, variant=variant, price=self.variant_price(self.product_mrp, variant))
+            for variant in self.product_variant
+            if variant in self.VARIANT_MULTIPLIER
+        ]
+        ProductVariantPrice.objects.bulk_create(
+            prices,
+            update_conflicts=True,
+            unique_fields=['product', 'variant'],
+            update_fields=['price'],
+        )
+        self.prices.exclude(variant__in=[price.variant for price in prices]).delete()
+        getattr(self, '_prefetched_objects_cache', {}).pop('prices', None)
+
+    @classmethod
+    def variant_price(cls, mrp, variant):
+        price = Decimal(str(mrp)) * cls.VARIANT_MULTIPLIER[variant]
+        return price.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
-        prices = {}
-        for variant in self.product_variant:
-            if variant in conversion:
-                prices[variant] = round(self.product_mrp * conversion[variant], 2)
-
-        self.product_price_data = prices
-        super().save(*args, **kwargs)
+    @property
+    def price_data(self):
+        """{variant: price} in variant order; prefetch `prices` to avoid a query."""
+        prices = {price.variant: float(price.price) for price in self.prices.all()}
+        return {variant: prices[variant] for variant in self.product_variant if variant in prices}
+
+    def get_price(self, variant):
+        """Unit price for a variant, falling back to the MRP."""
+        for price in self.prices.all():
+            if price.variant == variant:
+                return float(price.price)
+        return self.product_mrp
 
     def __str__(self):
         return self.product_name
@@ -104,6 +163,99 @@ class Product(models.Model):
     class Meta:
         ordering = ['product_name']
         verbose_name_plural = "Products"
+        indexes = [
+            models.Index(fields=['product_name', 'id'], name='product_name_idx'),
+        ]
+
+
+# -----------------------
+# Product Variant Price Model
+# -----------------------
+class ProductVariantPrice(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='prices')
+    variant = models.CharField(max_length=10, choices=Product.PRODUCT_VARIANT)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.product_id} - {self.variant}: {self.price}"
+
+    class Meta:
+        verbose_name_plural = "Product Variant Prices"
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'variant'], name='unique_product_variant_price'),
+        ]
+        indexes = [
+            models.Index(fields=['variant', 'price'], name='variant_price_idx'),
+        ]
+
+
+# -----------------------
+# Cart Manager
+# -----------------------
+class CartManager(models.Manager):
+    def add_item(self, user, product_id, variant, qty):
+        """
+        Insert a cart line or add `qty` to the existing one in a single
+        INSERT ... ON CONFLICT statement, so concurrent adds never duplicate
+        a line or lose an increment. Raises IntegrityError for unknown products.
+        """
+        connection = connections[router.db_for_write(self.model)]
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} ({quote('user_id')}, {quote('product_id')}, {quote('variant')}, {quote('qty')})
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT ({quote('user_id')}, {quote('product_id')}, {quote('variant')})
+                DO UPDATE SET {quote('qty')} = {table}.{quote('qty')} + EXCLUDED.{quote('qty')}
+                RETURNING {quote('id')}, {quote('qty')}
+                """,
+                [user.pk, product_id, variant, qty],
+            )
+            pk, total_qty = cursor.fetchone()
+
+        return self.model(pk=pk, user=user, product_id=product_id, variant=variant, qty=total_qty)
+
+    def sync(self, user, lines, replace=False):
+        """
+        Set the quantity of every {(product_id, variant): qty} line in one
+        multi-row upsert; a qty of 0 removes the line. With `replace`, lines
+        not listed are removed too, so the cart ends up exactly as `lines`.
+        Call inside a transaction. Raises IntegrityError for unknown products.
+        """
+        connection = connections[router.db_for_write(self.model)]
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        keep = {key: qty for key, qty in lines.items() if qty > 0}
+
+        kept_ids = []
+        if keep:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {table} ({quote('user_id')}, {quote('product_id')}, {quote('variant')}, {quote('qty')})
+                    VALUES {', '.join(['(%s, %s, %s, %s)'] * len(keep))}
+                    ON CONFLICT ({quote('user_id')}, {quote('product_id')}, {quote('variant')})
+                    DO UPDATE SET {quote('qty')} = EXCLUDED.{quote('qty')}
+                    RETURNING {quote('id')}
+                    """,
+                    [value for (product_id, variant), qty in keep.items() for value in (user.pk, product_id, variant, qty)],
+                )
+                kept_ids = [row[0] for row in cursor.fetchall()]
+
+        stale = self.filter(user=user)
+        if replace:
+            stale = stale.exclude(pk__in=kept_ids)
+        else:
+            removed = [key for key, qty in lines.items() if qty <= 0]
+            if not removed:
+                return
+            stale = stale.filter(Q.create(
+                [Q(product_id=product_id, variant=variant) for product_id, variant in removed], connector=Q.OR,
+            ))
+        stale.delete()
 
 
 # -----------------------
@@ -115,15 +267,24 @@ class Cart(models.Model):
     qty = models.PositiveIntegerField(default=1)
     variant = models.CharField(max_length=10, default='100g')
 
+    objects = CartManager()
+
+    @property
+    def unit_price(self):
+        return self.product.get_price(self.variant)
+
     @property
     def total_price(self):
-        return round(self.qty * self.product.product_price_data.get(self.variant, self.product.product_mrp), 2)
+        return round(self.qty * self.unit_price, 2)
 
     def __str__(self):
         return f"{self.user.phone_number} - {self.product.product_name} ({self.qty} x {self.variant})"
 
     class Meta:
         verbose_name_plural = "Carts"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'product', 'variant'], name='unique_cart_line'),
+        ]
 
 
 # -----------------------
@@ -145,6 +306,50 @@ class Address(models.Model):
         verbose_name_plural = "Addresses"
 
 
+# -----------------------
+# Order History Manager
+# -----------------------
+class OrderHistoryManager(models.Manager):
+    def transition(self, queryset, target, batch_size=1000):
+        """
+        Move every order in `queryset` that may go to `target`, with set-based
+        UPDATEs of `batch_size` rows. The delivery_date rule from save() runs in
+        SQL; the daily sales rollup, and stock for cancellations, are adjusted
+        in the same transaction. Returns {order_id: None if moved, else the reason it was skipped}.
+        """
+        results = {}
+        with transaction.atomic():
+            # Row locks, taken in id order, keep concurrent batches from interleaving
+            rows = list(
+                queryset.order_by('id').select_for_update()
+                .values('id', *DailySales.ORDER_FIELDS).iterator(chunk_size=batch_size)
+            )
+            moved = []
+            for row in rows:
+                if target in self.model.STATUS_TRANSITIONS[row['status']]:
+                    moved.append(row)
+                    results[row['id']] = None
+                else:
+                    results[row['id']] = f"cannot move from {row['status']} to {target}"
+
+            changes = {'status': target}
+            if target == "DELIVERED":
+                changes['delivery_date'] = Coalesce(F('delivery_date'), Now())
+            for start in range(0, len(moved), batch_size):
+                ids = [row['id'] for row in moved[start:start + batch_size]]
+                self.filter(pk__in=ids).update(**changes)
+
+            DailySales.objects.record(moved, sign=-1)
+            DailySales.objects.record([{**row, 'status': target} for row in moved])
+            if target == "CANCELLED":
+                returned = {}
+                for row in moved:
+                    key = (row['product_id'], row['variant'])
+                    returned[key] = returned.get(key, 0) + row['qty']
+                ProductStock.objects.put_back(returned)
+        return results
+
+
 # -----------------------
 # Order History Model
 # -----------------------
@@ -156,6 +361,14 @@ class OrderHistory(models.Model):
         ("DELIVERED", "Delivered"),
         ("CANCELLED", "Cancelled"),
     ]
+    # Statuses each status may move to in a bulk transition
+    STATUS_TRANSITIONS = {
+        "PENDING": {"PROCESSING", "CANCELLED"},
+        "PROCESSING": {"SHIPPED", "CANCELLED"},
+        "SHIPPED": {"DELIVERED"},
+        "DELIVERED": set(),
+        "CANCELLED": set(),
+    }
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -179,15 +392,19 @@ class OrderHistory(models.Model):
 
     bill_amount = models.FloatField(default=0.0)
 
+    objects = OrderHistoryManager()
+
     def save(self, *args, **kwargs):
         if not self.bill_amount:
-            price = self.product.product_price_data.get(self.variant, self.product.product_mrp)
+            price = self.product.get_price(self.variant)
             self.bill_amount = round(price * self.qty, 2)
 
         if self.status == "DELIVERED" and not self.delivery_date:
             self.delivery_date = timezone.now()
 
-        super().save(*args, **kwargs)
+        # The daily sales rollup is updated by signals inside this transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Order #{self.id} - {self.product.product_name} ({self.status})"
@@ -195,6 +412,319 @@ class OrderHistory(models.Model):
     class Meta:
         ordering = ['-order_date']
         verbose_name_plural = "Order Histories"
+        indexes = [
+            models.Index(fields=['user', '-order_date', '-id'], name='order_user_date_idx'),
+            models.Index(fields=['order_date', 'id'], name='order_date_idx'),
+            models.Index(
+                fields=['status', 'order_date'],
+                name='order_open_status_idx',
+                condition=~models.Q(status__in=['DELIVERED', 'CANCELLED']),
+            ),
+        ]
+
+
+# -----------------------
+# Daily Sales Manager
+# -----------------------
+class DailySalesManager(models.Manager):
+    @staticmethod
+    def order_key(order_date, product_id, variant, status):
+        return (timezone.localdate(order_date), product_id, variant, status)
+
+    def record(self, orders, sign=1):
+        """Add (sign=1) or remove (sign=-1) OrderHistory rows or snapshot dicts."""
+        deltas = {}
+        for order in orders:
+            if not isinstance(order, dict):
+                order = {field: getattr(order, field) for field in self.model.ORDER_FIELDS}
+            key = self.order_key(order['order_date'], order['product_id'], order['variant'], order['status'])
+            totals = deltas.setdefault(key, [0, 0, Decimal('0.00')])
+            totals[0] += sign
+            totals[1] += sign * order['qty']
+            totals[2] += sign * Decimal(str(order['bill_amount']))
+        self.apply(deltas)
+
+    def apply(self, deltas):
+        """
+        Add {(day, product_id, variant, status): [orders, units, revenue]} to the
+        rollup with one multi-row INSERT ... ON CONFLICT DO UPDATE statement.
+        """
+        deltas = {key: totals for key, totals in deltas.items() if any(totals)}
+        if not deltas:
+            return
+        connection = connections[router.db_for_write(self.model)]
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        key_columns = ', '.join(quote(column) for column in ('day', 'product_id', 'variant', 'status'))
+        totals = [quote(column) for column in ('orders', 'units', 'revenue')]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} ({key_columns}, {', '.join(totals)})
+                VALUES {', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(deltas))}
+                ON CONFLICT ({key_columns})
+                DO UPDATE SET {', '.join(f'{column} = {table}.{column} + EXCLUDED.{column}' for column in totals)}
+                """,
+                [value for key, values in deltas.items() for value in (*key, *values)],
+            )
+
+    def from_orders(self, day_from=None, day_to=None, chunk_size=1000):
+        """The rollup recomputed from OrderHistory, streamed as unsaved rows."""
+        orders = OrderHistory.objects.order_by().annotate(day=TruncDate('order_date'))
+        if day_from:
+            orders = orders.filter(day__gte=day_from)
+        if day_to:
+            orders = orders.filter(day__lte=day_to)
+        rows = orders.values('day', 'product_id', 'variant', 'status').annotate(
+            order_count=Count('id'), unit_count=Sum('qty'), revenue_total=Sum('bill_amount'),
+        )
+        return (
+            self.model(
+                day=row['day'], product_id=row['product_id'], variant=row['variant'], status=row['status'],
+                orders=row['order_count'], units=row['unit_count'],
+                revenue=Decimal(str(row['revenue_total'])).quantize(Decimal('0.01')),
+            )
+            for row in rows.iterator(chunk_size=chunk_size)
+        )
+
+    def rebuild(self, day_from=None, day_to=None, batch_size=1000):
+        """Replace the rollup rows in the day range with ones recomputed from OrderHistory."""
+        existing = self.all()
+        if day_from:
+            existing = existing.filter(day__gte=day_from)
+        if day_to:
+            existing = existing.filter(day__lte=day_to)
+        rebuilt = 0
+        with transaction.atomic():
+            existing.delete()
+            # One batch in memory at a time, however many orders there are
+            rows = self.from_orders(day_from, day_to, chunk_size=batch_size)
+            while batch := list(islice(rows, batch_size)):
+                self.bulk_create(batch)
+                rebuilt += len(batch)
+        return rebuilt
+
+
+# -----------------------
+# Daily Sales Model
+# -----------------------
+class DailySales(models.Model):
+    """Orders, units and revenue per (day, product, variant, status), kept in step with OrderHistory."""
+    ORDER_FIELDS = ['order_date', 'product_id', 'variant', 'status', 'qty', 'bill_amount']
+
+    day = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_sales')
+    variant = models.CharField(max_length=10)
+    status = models.CharField(max_length=20, choices=OrderHistory.STATUS_CHOICES)
+    orders = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    objects = DailySalesManager()
+
+    def __str__(self):
+        return f"{self.day} - {self.product_id} {self.variant} ({self.status})"
+
+    class Meta:
+        ordering = ['-day']
+        verbose_name_plural = "Daily Sales"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'product', 'variant', 'status'], name='unique_daily_sales'),
+        ]
+
+
+# -----------------------
+# Product Stock Manager
+# -----------------------
+class OutOfStock(Exception):
+    """A (product, variant) has fewer units on hand than an order asks for."""
+
+    def __init__(self, product_id, variant, requested):
+        self.product_id, self.variant, self.requested = product_id, variant, requested
+        super().__init__(f"Product {product_id} ({variant}) has fewer than {requested} in stock")
+
+
+class ProductStockManager(models.Manager):
+    def take(self, quantities):
+        """
+        Remove {(product_id, variant): qty} from stock under row locks, so two
+        checkouts can never both take the last unit. Locks are taken in SKU
+        order and, within a SKU, in shard order or without waiting, so
+        checkouts cannot deadlock each other. SKUs without stock rows are not
+        tracked. A negative qty puts units back in the same pass, so a
+        transaction that both takes and returns stock keeps that lock order.
+        Call inside a transaction: on OutOfStock the caller's rollback undoes
+        whatever was already taken.
+        """
+        wanted = {key: qty for key, qty in quantities.items() if qty > 0}
+        shards = {}
+        if wanted:
+            rows = self.filter(product_id__in={product_id for product_id, _ in wanted}).order_by('shard')
+            for product_id, variant, shard in rows.values_list('product_id', 'variant', 'shard'):
+                shards.setdefault((product_id, variant), []).append(shard)
+
+        # A fixed SKU order keeps multi-line checkouts from deadlocking each other
+        for key in sorted(key for key, qty in quantities.items() if qty):
+            if quantities[key] < 0:
+                self.put_back({key: -quantities[key]})
+            elif key in shards:
+                self._take_sku(*key, quantities[key], shards[key])
+
+    def _take_sku(self, product_id, variant, qty, shards):
+        sku = self.filter(product_id=product_id, variant=variant)
+        if len(shards) == 1:
+            # One row: the conditional UPDATE is the only lock taken
+            if not sku.filter(stock__gte=qty).update(stock=F('stock') - qty):
+                raise OutOfStock(product_id, variant, qty)
+            return
+
+        # Lock one shard that holds enough without waiting: concurrent buyers of
+        # a hot SKU skip each other's rows instead of queueing on them, and never
+        # hold one shard while waiting for another
+        shard = (
+            sku.filter(stock__gte=qty).order_by('shard')
+            .select_for_update(skip_locked=True).values_list('shard', flat=True).first()
+        )
+        if shard is not None:
+            sku.filter(shard=shard).update(stock=F('stock') - qty)
+            return
+
+        # Lock every shard in shard order before changing any, and take across them
+        rows = list(sku.order_by('shard').select_for_update().values_list('shard', 'stock'))
+        if sum(stock for _, stock in rows) < qty:
+            raise OutOfStock(product_id, variant, qty)
+        remaining = qty
+        for shard, stock in rows:
+            step = min(stock, remaining)
+            if step:
+                sku.filter(shard=shard).update(stock=F('stock') - step)
+                remaining -= step
+
+    def put_back(self, quantities):
+        """Return {(product_id, variant): qty} to stock, e.g. for a cancelled order."""
+        for (product_id, variant), qty in sorted(quantities.items()):
+            if qty > 0:
+                self.filter(product_id=product_id, variant=variant, shard=0).update(stock=F('stock') + qty)
+
+    def set_stock(self, product_id, variant, stock, shards=1):
+        """Set a SKU's units on hand, spread evenly over `shards` rows."""
+        with transaction.atomic():
+            self.filter(product_id=product_id, variant=variant, shard__gte=shards).delete()
+            for shard in range(shards):
+                self.update_or_create(
+                    product_id=product_id, variant=variant, shard=shard,
+                    defaults={'stock': stock // shards + (shard < stock % shards)},
+                )
+
+
+# -----------------------
+# Product Stock Model
+# -----------------------
+class ProductStock(models.Model):
+    """
+    Units on hand for a (product, variant). A hot SKU can be split over several
+    shard rows that add up to its stock, so concurrent checkouts lock different
+    rows. A SKU without rows is not stock-tracked and never sells out.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock')
+    variant = models.CharField(max_length=10, choices=Product.PRODUCT_VARIANT)
+    shard = models.PositiveSmallIntegerField(default=0)
+    stock = models.PositiveIntegerField(default=0)
+
+    objects = ProductStockManager()
+
+    def __str__(self):
+        return f"{self.product_id} - {self.variant} #{self.shard}: {self.stock}"
+
+    class Meta:
+        verbose_name_plural = "Product Stock"
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'variant', 'shard'], name='unique_product_stock_shard'),
+        ]
+
+
+# -----------------------
+# Stock Reservation Manager
+# -----------------------
+class StockReservationManager(models.Manager):
+    def reserve(self, user, quantities):
+        """
+        Hold {(product_id, variant): qty} for the user's checkout, replacing
+        their previous hold. Returns when the hold expires. Call inside a
+        transaction; raises OutOfStock.
+        """
+        previous = list(self.filter(user=user).select_for_update().values_list('id', 'product_id', 'variant', 'qty'))
+        # Take only the difference from the previous hold, in one pass
+        changes = dict(quantities)
+        for _, product_id, variant, qty in previous:
+            changes[(product_id, variant)] = changes.get((product_id, variant), 0) - qty
+        ProductStock.objects.take(changes)
+        self.filter(pk__in=[row[0] for row in previous]).delete()
+        expires_at = timezone.now() + timedelta(minutes=settings.STOCK_RESERVATION_MINUTES)
+        self.bulk_create([
+            self.model(user=user, product_id=product_id, variant=variant, qty=qty, expires_at=expires_at)
+            for (product_id, variant), qty in quantities.items() if qty > 0
+        ])
+        return expires_at
+
+    def consume(self, user, quantities):
+        """
+        Take stock for an order, drawing on the user's hold first (even an
+        expired one that has not been released yet, as its stock is still set
+        aside). Whatever the order does not use goes back to stock.
+        """
+        held = {}
+        reservations = list(self.filter(user=user).select_for_update().values_list('id', 'product_id', 'variant', 'qty'))
+        for _, product_id, variant, qty in reservations:
+            held[(product_id, variant)] = held.get((product_id, variant), 0) + qty
+
+        ProductStock.objects.take({
+            key: quantities.get(key, 0) - held.get(key, 0) for key in quantities.keys() | held.keys()
+        })
+        if reservations:
+            self.filter(pk__in=[row[0] for row in reservations]).delete()
+
+    def release(self, reservations, skip_locked=False):
+        """Return the stock held by `reservations` and delete them. Returns how many were released."""
+        with transaction.atomic():
+            rows = list(reservations.select_for_update(skip_locked=skip_locked).values_list('id', 'product_id', 'variant', 'qty'))
+            quantities = {}
+            for _, product_id, variant, qty in rows:
+                quantities[(product_id, variant)] = quantities.get((product_id, variant), 0) + qty
+            ProductStock.objects.put_back(quantities)
+            self.filter(pk__in=[row[0] for row in rows]).delete()
+        return len(rows)
+
+    def release_expired(self, limit=None):
+        """Release abandoned holds; rows a checkout is consuming right now are skipped."""
+        expired = self.filter(expires_at__lte=timezone.now()).order_by('expires_at')
+        if limit:
+            expired = self.filter(pk__in=list(expired.values_list('pk', flat=True)[:limit]))
+        return self.release(expired, skip_locked=True)
+
+
+# -----------------------
+# Stock Reservation Model
+# -----------------------
+class StockReservation(models.Model):
+    """Stock set aside for a user's checkout until `expires_at`."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='stock_reservations')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    variant = models.CharField(max_length=10)
+    qty = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+
+    objects = StockReservationManager()
+
+    def __str__(self):
+        return f"{self.user_id}: {self.qty} x {self.product_id} {self.variant} until {self.expires_at}"
+
+    class Meta:
+        verbose_name_plural = "Stock Reservations"
+        indexes = [
+            models.Index(fields=['expires_at'], name='reservation_expiry_idx'),
+        ]
 
 
 # -----------------------
@@ -215,6 +745,11 @@ class Review(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        # The rating summary is updated by signals inside this transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.product.product_name} - {self.star}★"
 
@@ -222,6 +757,104 @@ class Review(models.Model):
         unique_together = ('product', 'user')
         ordering = ['-created_at']
         verbose_name_plural = "Reviews"
+        indexes = [
+            models.Index(fields=['product', '-created_at', '-id'], name='review_product_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='review_created_idx'),
+        ]
+
+
+# -----------------------
+# Product Rating Manager
+# -----------------------
+class ProductRatingManager(models.Manager):
+    def record(self, product_id, star, delta):
+        """
+        Add (delta=1) or remove (delta=-1) one review of `star` stars from a
+        product's summary with a single F()-based UPDATE.
+        """
+        star = int(star)
+        updates = {
+            'count': F('count') + delta,
+            'total': F('total') + delta * star,
+            f'star_{star}': F(f'star_{star}') + delta,
+            'average': Coalesce(
+                Cast(F('total') + delta * star, FloatField()) / NullIf(F('count') + delta, 0),
+                Value(0.0),
+            ),
+        }
+        if not self.filter(product_id=product_id).update(**updates):
+            self.bulk_create([self.model(product_id=product_id)], ignore_conflicts=True)
+            self.filter(product_id=product_id).update(**updates)
+
+    def rebuild(self, batch_size=1000):
+        """Recompute every summary from Review in one grouped pass."""
+        rows = (
+            Product.objects.order_by()
+            .annotate(
+                review_count=Count('review'),
+                review_total=Coalesce(Sum(Cast('review__star', IntegerField())), 0),
+                **{
+                    f'review_star_{star}': Count('review', filter=Q(review__star=str(star)))
+                    for star in range(1, 6)
+                },
+            )
+            .values_list(
+                'id', 'review_count', 'review_total',
+                *(f'review_star_{star}' for star in range(1, 6)),
+            )
+        )
+        summaries = (
+            self.model(
+                product_id=product_id,
+                count=count,
+                total=total,
+                star_1=stars[0], star_2=stars[1], star_3=stars[2], star_4=stars[3], star_5=stars[4],
+                average=total / count if count else 0.0,
+            )
+            for product_id, count, total, *stars in rows.iterator(chunk_size=batch_size)
+        )
+        rebuilt = 0
+        with transaction.atomic():
+            while batch := list(islice(summaries, batch_size)):
+                self.bulk_create(
+                    batch,
+                    update_conflicts=True,
+                    unique_fields=['product'],
+                    update_fields=['count', 'total', 'star_1', 'star_2', 'star_3', 'star_4', 'star_5', 'average'],
+                )
+                rebuilt += len(batch)
+        return rebuilt
+
+
+# -----------------------
+# Product Rating Model
+# -----------------------
+class ProductRating(models.Model):
+    """Denormalized review summary, kept in step with Review by api.signals."""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='rating')
+    count = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    star_1 = models.PositiveIntegerField(default=0)
+    star_2 = models.PositiveIntegerField(default=0)
+    star_3 = models.PositiveIntegerField(default=0)
+    star_4 = models.PositiveIntegerField(default=0)
+    star_5 = models.PositiveIntegerField(default=0)
+    average = models.FloatField(default=0.0)
+
+    objects = ProductRatingManager()
+
+    @property
+    def histogram(self):
+        return {str(star): getattr(self, f'star_{star}') for star in range(1, 6)}
+
+    def __str__(self):
+        return f"{self.product_id} - {self.average:.2f}★ ({self.count})"
+
+    class Meta:
+        verbose_name_plural = "Product Ratings"
+        indexes = [
+            models.Index(fields=['-average', '-product'], name='rating_average_idx'),
+        ]
 
 
 # -----------------------
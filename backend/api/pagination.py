@@ -0,0 +1,181 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque-cursor keyset pagination.
+
+    Pages are ordered by the queryset's ordering (the model's Meta.ordering by
+    default) with `id` appended as a tie-breaker, and every page seeks past the
+    last row of the previous one with a WHERE clause instead of an OFFSET, so
+    page N costs the same as page 1.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    tie_breaker = 'id'
+    invalid_cursor_message = 'Invalid cursor'
+    # Links point at the request's own URL unless this is set
+    url = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request)))
+
+    def page_queryset(self, queryset, request):
+        """The unevaluated queryset for the requested page (plus one look-ahead row)."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.fields = [self._lookup_field(queryset.model, name.lstrip('-')) for name in self.ordering]
+        # Where each ordering value sits in a .values() row, e.g. 'rating__average'
+        self.position_lookups = ['__'.join([*relations, field.attname]) for relations, field in self.fields]
+
+        self.cursor = self.decode_cursor(request)
+        self.reverse = bool(self.cursor and self.cursor['reverse'])
+        ordering = [self._flip(name) for name in self.ordering] if self.reverse else self.ordering
+
+        queryset = queryset.order_by(*ordering)
+        if self.cursor:
+            queryset = queryset.filter(self._seek(ordering, self.cursor['position']))
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        """Trim the rows fetched from page_queryset() to the page and work out the links."""
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        page_size = settings.API_PAGE_SIZE
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+            if requested > 0:
+                page_size = requested
+        except (KeyError, ValueError):
+            pass
+        return min(page_size, settings.API_MAX_PAGE_SIZE)
+
+    def get_ordering(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not any(name.lstrip('-') in (self.tie_breaker, 'pk') for name in ordering):
+            descending = bool(ordering) and ordering[0].startswith('-')
+            ordering.append(('-' if descending else '') + self.tie_breaker)
+        return [name[:-2] + self.tie_breaker if name.lstrip('-') == 'pk' else name for name in ordering]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.get_url(), self.cursor_query_param)
+        return self._link(self.page[0], reverse=True)
+
+    def get_url(self):
+        return self.url or self.request.build_absolute_uri()
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        return urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            position = payload['p']
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+            # A tampered value must not reach the database as e.g. id = 'abc'
+            position = [self._clean(field, value) for (_, field), value in zip(self.fields, position)]
+            return {'position': position, 'reverse': bool(payload.get('r'))}
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _link(self, instance, reverse):
+        position = []
+        for (relations, field), lookup in zip(self.fields, self.position_lookups):
+            if isinstance(instance, dict):
+                # A .values() row (api.fast.FastListMixin)
+                obj = SimpleNamespace(**{field.attname: instance[lookup]})
+            else:
+                obj = instance
+                for relation in relations:
+                    obj = getattr(obj, relation)
+            position.append(field.value_to_string(obj))
+        return replace_query_param(
+            self.get_url(),
+            self.cursor_query_param,
+            self.encode_cursor(position, reverse),
+        )
+
+    def _seek(self, ordering, position):
+        """(a, b) > (x, y) expanded to `a > x OR (a = x AND b > y)`, per direction."""
+        condition = Q()
+        for index, name in enumerate(ordering):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            step = Q(**{f'{field}__{lookup}': position[index]})
+            for previous, value in zip(ordering[:index], position[:index]):
+                step &= Q(**{previous.lstrip('-'): value})
+            condition |= step
+        return condition
+
+    @staticmethod
+    def _clean(field, value):
+        if not isinstance(value, str):
+            raise ValueError
+        value = field.to_python(value)
+        field.run_validators(value)
+        return value
+
+    @staticmethod
+    def _lookup_field(model, path):
+        """Split `rating__average` into (['rating'], <average field>)."""
+        *relations, name = path.split('__')
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        return relations, model._meta.get_field(name)
+
+    @staticmethod
+    def _flip(name):
+        return name[1:] if name.startswith('-') else '-' + name
@@ -0,0 +1,161 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Catalogue models a read-only request may read from a replica
+REPLICA_MODELS = {'api.product', 'api.productvariantprice', 'api.productrating', 'api.review'}
+# Writing any of these pins the user to the primary for DB_REPLICA_STICKY_SECONDS
+STICKY_MODELS = {'api.cart', 'api.orderhistory', 'api.address', 'api.review'}
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_request = ContextVar('replica_request', default=None)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+def pin_key(user_id):
+    return f'db:pinned:{user_id}'
+
+
+class RequestRouting:
+    """Where the current request's reads go; set by ReplicaRoutingMiddleware."""
+
+    def __init__(self, request, replicas):
+        self.request = request
+        # One replica per request, so its reads do not mix replicas at different lag
+        self.replica = random.choice(replicas)
+        self.read_only = request.method in SAFE_METHODS
+        self.forced = False
+        self.wrote = False
+        self._pinned = None
+
+    def pinned(self):
+        # Checked lazily: DRF only authenticates the user once the view runs
+        if self._pinned is None:
+            user = getattr(self.request, 'user', None)
+            if user is None:
+                return False
+            self._pinned = user.is_authenticated and cache.get(pin_key(user.pk)) is not None
+        return self._pinned
+
+    def use_replica(self):
+        return (
+            self.read_only and not self.forced and not self.pinned()
+            # Reads inside a transaction must see its own writes
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        )
+
+
+@contextmanager
+def primary():
+    """Send every read in the block to the primary."""
+    routing = _request.get()
+    if routing is None:
+        yield
+        return
+    forced, routing.forced = routing.forced, True
+    try:
+        yield
+    finally:
+        routing.forced = forced
+
+
+# -----------------------
+# Router
+# -----------------------
+class ReplicaRouter:
+    """
+    Primary/replica routing. Writes, and every read outside a read-only
+    request, go to `default`; catalogue reads (REPLICA_MODELS) in a GET go to
+    one of the replica aliases, unless the user is pinned after a write.
+    With no replicas configured everything stays on `default`.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Related objects and prefetches come from wherever the instance did
+            return instance._state.db
+        routing = _request.get()
+        if routing is not None and model._meta.label_lower in REPLICA_MODELS and routing.use_replica():
+            return routing.replica
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        routing = _request.get()
+        if routing is not None and model._meta.label_lower in STICKY_MODELS:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+# -----------------------
+# Middleware
+# -----------------------
+class ReplicaRoutingMiddleware:
+    """
+    Track each request for ReplicaRouter, and after a request that wrote a
+    STICKY_MODELS row, pin its user to the primary for
+    DB_REPLICA_STICKY_SECONDS so they read their own writes. Pins live in the
+    default cache, so every process sees them when that cache is shared.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.replicas = replica_aliases()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.replicas:
+            return self.get_response(request)
+        routing = RequestRouting(request, self.replicas)
+        token = _request.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        self.pin(request, routing, response)
+        return response
+
+    async def __acall__(self, request):
+        if not self.replicas:
+            return await self.get_response(request)
+        routing = RequestRouting(request, self.replicas)
+        token = _request.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request.reset(token)
+        await self.apin(request, routing, response)
+        return response
+
+    def should_pin(self, request, routing, response):
+        user = getattr(request, 'user', None)
+        return routing.wrote and response.status_code < 400 and user is not None and user.is_authenticated
+
+    def pin(self, request, routing, response):
+        if self.should_pin(request, routing, response):
+            cache.set(pin_key(request.user.pk), 1, settings.DB_REPLICA_STICKY_SECONDS)
+
+    async def apin(self, request, routing, response):
+        if self.should_pin(request, routing, response):
+            await cache.aset(pin_key(request.user.pk), 1, settings.DB_REPLICA_STICKY_SECONDS)
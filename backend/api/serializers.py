@@ -1,11 +1,13 @@
 from rest_framework import serializers
-from api.models import Product, Cart, OrderHistory, Review, ContactForm, Address
+from api.models import Product, ProductRating, Cart, OrderHistory, Review, ContactForm, Address
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from api.images import derivative_urls
+from api.metrics import TimedSerializerMixin
 
 User = get_user_model()
 
-class RegisterSerializer(serializers.ModelSerializer):
+class RegisterSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     confirm_password = serializers.CharField(write_only=True)
     agree_terms = serializers.BooleanField(write_only=True)
     password = serializers.CharField(write_only=True, validators=[validate_password])
@@ -42,54 +44,72 @@ class RegisterSerializer(serializers.ModelSerializer):
         user = User.objects.create_user(**validated_data)
         return user
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'email', 'phone_number', 'first_name', 'last_name']
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductRatingSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    average = serializers.SerializerMethodField()
+    histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
     class Meta:
-        model = Product
-        fields = '__all__'
+        model = ProductRating
+        fields = ['average', 'count', 'histogram']
+
+    def get_average(self, obj):
+        return round(obj.average, 2)
 
 
-class CartProductSerializer(serializers.ModelSerializer):
-    """Nested product serializer for cart items"""
-    name = serializers.CharField(source='product_name')
-    price = serializers.SerializerMethodField()
-    image = serializers.ImageField(source='product_image')
+class ProductSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    product_price_data = serializers.DictField(source='price_data', read_only=True)
+    rating = ProductRatingSerializer(read_only=True)
+    images = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
-        fields = ['id', 'name', 'price', 'image']
+        exclude = ['image_derivatives']
+
+    def get_images(self, obj):
+        """{'jpg': {width: url}, 'webp': {width: url}} for srcset"""
+        return derivative_urls(obj.image_derivatives, self.context.get('request'))
+
+
+class CartProductSerializer(TimedSerializerMixin, serializers.Serializer):
+    """Nested product details of a cart line, priced for the line's own variant"""
+    id = serializers.IntegerField(source='product_id')
+    name = serializers.CharField(source='product.product_name')
+    price = serializers.FloatField(source='unit_price')
+    image = serializers.ImageField(source='product.product_image')
+    images = serializers.SerializerMethodField()
+
+    def get_images(self, obj):
+        return derivative_urls(obj.product.image_derivatives, self.context.get('request'))
 
-    def get_price(self, obj):
-        # Get the variant from context if available
-        variant = self.context.get('variant', '100g')
-        return obj.product_price_data.get(variant, obj.product_mrp)
 
-class CartSerializer(serializers.ModelSerializer):
-    product = CartProductSerializer(read_only=True)
+class CartSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    product = CartProductSerializer(source='*', read_only=True)
     product_id = serializers.PrimaryKeyRelatedField(
         queryset=Product.objects.all(),
         source='product',
         write_only=True
     )
     quantity = serializers.IntegerField(source='qty')
+    line_total = serializers.FloatField(source='total_price', read_only=True)
 
     class Meta:
         model = Cart
-        fields = ['id', 'product', 'product_id', 'quantity', 'variant']
+        fields = ['id', 'product', 'product_id', 'quantity', 'variant', 'line_total']
         read_only_fields = ['id']
 
-class AddressSerializer(serializers.ModelSerializer):
+class AddressSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Address
         fields = ['id', 'address_lane1', 'address_landmark', 'address_city',
                   'address_district', 'address_state', 'address_pincode']
 
-class OrderHistorySerializer(serializers.ModelSerializer):
+class OrderHistorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)
     address = AddressSerializer(read_only=True)
 
@@ -107,18 +127,19 @@ class OrderHistorySerializer(serializers.ModelSerializer):
             'status',
             'bill_amount',
         ]
-        read_only_fields = ['user']
+        # Status only moves through OrderHistory.objects.transition; the bill is set at checkout
+        read_only_fields = ['user', 'status', 'bill_amount']
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = '__all__'
 
-class ContactFormSerializer(serializers.ModelSerializer):
+class ContactFormSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ContactForm
         fields = '__all__'
@@ -0,0 +1,110 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.contrib.auth import get_user_model
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .cache import bump_catalogue_version
+from .metrics import time_query
+from .models import DailySales, OrderHistory, Product, ProductRating, Review
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_catalogue(sender, **kwargs):
+    """Bump the catalogue version once the product change is committed."""
+    transaction.on_commit(bump_catalogue_version)
+
+
+@receiver(post_save, sender=Product)
+def create_product_rating(sender, instance, created, raw=False, **kwargs):
+    """Every product starts with an empty rating summary."""
+    if created and not raw:
+        ProductRating.objects.get_or_create(product=instance)
+
+
+# -----------------------
+# Rating summary
+# -----------------------
+@receiver(pre_save, sender=Review)
+def remember_previous_review(sender, instance, raw=False, **kwargs):
+    instance._previous_rating = None
+    if instance.pk and not raw:
+        instance._previous_rating = (
+            Review.objects.filter(pk=instance.pk).values_list('product_id', 'star').first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def record_review(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_rating', None)
+    current = (instance.product_id, instance.star)
+    if previous == current:
+        return
+    if previous is not None:
+        ProductRating.objects.record(*previous, delta=-1)
+    ProductRating.objects.record(*current, delta=1)
+    transaction.on_commit(bump_catalogue_version)
+
+
+@receiver(post_delete, sender=Review)
+def forget_review(sender, instance, **kwargs):
+    ProductRating.objects.record(instance.product_id, instance.star, delta=-1)
+    transaction.on_commit(bump_catalogue_version)
+
+
+# -----------------------
+# Daily sales rollup
+# -----------------------
+@receiver(pre_save, sender=OrderHistory)
+def remember_previous_order(sender, instance, raw=False, **kwargs):
+    instance._previous_sales = None
+    if instance.pk and not raw:
+        instance._previous_sales = (
+            OrderHistory.objects.filter(pk=instance.pk).values(*DailySales.ORDER_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=OrderHistory)
+def record_order_sales(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_sales', None)
+    current = {field: getattr(instance, field) for field in DailySales.ORDER_FIELDS}
+    if previous == current:
+        return
+    if previous is not None:
+        DailySales.objects.record([previous], sign=-1)
+    DailySales.objects.record([current])
+
+
+@receiver(post_delete, sender=OrderHistory)
+def forget_order_sales(sender, instance, **kwargs):
+    DailySales.objects.record([instance], sign=-1)
+
+
+# -----------------------
+# Token cache
+# -----------------------
+@receiver(post_delete, sender=Token)
+def revoke_token(sender, instance, **kwargs):
+    token_cache.revoke(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def revoke_user_tokens(sender, instance, **kwargs):
+    """Password changes, deactivation and profile edits must not serve a stale user."""
+    token_cache.revoke_user(instance.pk)
+
+
+# -----------------------
+# Request metrics
+# -----------------------
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    """One wrapper per connection, outermost, so execute_wrapper() blocks still pop their own."""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, time_query)
@@ -0,0 +1,117 @@
+import threading
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from api.models import Cart
+
+from .utils import client_for, make_product, make_user
+
+CART = '/api/v1/Cart/'
+
+
+class AddToCartTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.product = make_product(variants=['100g', '500g'])
+        self.client = client_for(self.user)
+
+    def add(self, **data):
+        return self.client.post(CART, {'product_id': self.product.pk, 'quantity': 1, **data}, format='json')
+
+    def test_adding_twice_increments_one_line(self):
+        self.assertEqual(self.add(variant='500g', quantity=2).status_code, 201)
+        response = self.add(variant='500g', quantity=3)
+        self.assertEqual(response.data['quantity'], 5)
+        self.assertEqual(Cart.objects.get(user=self.user).qty, 5)
+
+    def test_rejects_variant_the_product_is_not_sold_in(self):
+        response = self.add(variant='1kg')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['variants'], ['100g', '500g'])
+        self.assertFalse(Cart.objects.exists())
+
+    def test_rejects_overlong_and_non_string_variants(self):
+        for variant in ['x' * 500, 5, {'size': '100g'}]:
+            self.assertEqual(self.add(variant=variant).status_code, 400, variant)
+        self.assertFalse(Cart.objects.exists())
+
+    def test_unknown_product_is_not_found(self):
+        response = self.client.post(CART, {'product_id': self.product.pk + 100}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+
+class SyncCartTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.product = make_product(variants=['100g', '500g'])
+        self.client = client_for(self.user)
+
+    def sync(self, items, **data):
+        return self.client.post(f'{CART}sync/', {'items': items, **data}, format='json')
+
+    def test_sets_quantities_and_removes_zero_lines(self):
+        Cart.objects.add_item(self.user, self.product.pk, '100g', 1)
+        response = self.sync([
+            {'product_id': self.product.pk, 'variant': '100g', 'quantity': 0},
+            {'product_id': self.product.pk, 'variant': '500g', 'quantity': 3},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Cart.objects.filter(user=self.user).values_list('variant', 'qty')), [('500g', 3)])
+
+    def test_rejects_each_variant_the_product_is_not_sold_in(self):
+        response = self.sync([
+            {'product_id': self.product.pk, 'variant': '500g', 'quantity': 1},
+            {'product_id': self.product.pk, 'variant': '1kg', 'quantity': 1},
+            {'product_id': self.product.pk, 'variant': 'x' * 500, 'quantity': 2},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['items'], [
+            {'product_id': self.product.pk, 'variant': '1kg'},
+            {'product_id': self.product.pk, 'variant': 'x' * 500},
+        ])
+        self.assertFalse(Cart.objects.exists())
+
+    def test_rejects_non_string_variants(self):
+        response = self.sync([{'product_id': self.product.pk, 'variant': 5, 'quantity': 1}])
+        self.assertEqual(response.status_code, 400)
+
+    def test_removing_a_variant_no_longer_sold_is_allowed(self):
+        Cart.objects.create(user=self.user, product=self.product, variant='1kg', qty=1)
+        response = self.sync([{'product_id': self.product.pk, 'variant': '1kg', 'quantity': 0}])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Cart.objects.exists())
+
+
+class ConcurrentAddToCartTests(TransactionTestCase):
+    threads = 8
+    adds_per_thread = 10
+
+    def test_concurrent_adds_never_lose_an_increment(self):
+        user = make_user()
+        product = make_product()
+        clients = [client_for(user) for _ in range(self.threads)]
+        statuses, lock = [], threading.Lock()
+        start = threading.Barrier(self.threads)
+
+        def hammer(client):
+            try:
+                start.wait()
+                codes = [
+                    client.post(CART, {'product_id': product.pk, 'variant': '100g', 'quantity': 1}, format='json').status_code
+                    for _ in range(self.adds_per_thread)
+                ]
+                with lock:
+                    statuses.extend(codes)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=hammer, args=(client,)) for client in clients]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(statuses, [201] * self.threads * self.adds_per_thread)
+        line = Cart.objects.get(user=user, product=product, variant='100g')
+        self.assertEqual(line.qty, self.threads * self.adds_per_thread)
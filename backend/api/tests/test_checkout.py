@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from api.models import Cart, OrderHistory, ProductVariantPrice
+
+from .utils import client_for, make_address, make_product, make_user
+
+CHECKOUT = '/api/v1/orders/create/'
+
+
+class CheckoutTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.address = make_address(self.user)
+        self.product = make_product(variants=['100g', '500g'], mrp=120.5)
+        self.client = client_for(self.user)
+
+    def checkout(self, items, address_id=None):
+        return self.client.post(CHECKOUT, {
+            'address_id': self.address.pk if address_id is None else address_id, 'items': items,
+        }, format='json')
+
+    def test_places_orders_at_variant_prices(self):
+        Cart.objects.add_item(self.user, self.product.pk, '100g', 1)
+        response = self.checkout([
+            {'product_id': self.product.pk, 'variant': '100g', 'quantity': 2},
+            {'product_id': self.product.pk, 'variant': '500g', 'quantity': 1},
+        ])
+        self.assertEqual(response.status_code, 201)
+        prices = dict(ProductVariantPrice.objects.filter(product=self.product).values_list('variant', 'price'))
+        self.assertEqual(prices, {'100g': Decimal('120.50'), '500g': Decimal('602.50')})
+        bills = dict(OrderHistory.objects.filter(user=self.user).values_list('variant', 'bill_amount'))
+        self.assertEqual(bills, {'100g': 2 * 120.5, '500g': 1 * 602.5})
+        self.assertEqual(response.data['bill_amount'], 2 * 120.5 + 602.5)
+        self.assertFalse(Cart.objects.filter(user=self.user).exists())
+
+    def test_rejects_variant_the_product_is_not_sold_in(self):
+        response = self.checkout([{'product_id': self.product.pk, 'variant': '1kg', 'quantity': 1}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['items'], [{'product_id': self.product.pk, 'variant': '1kg'}])
+        self.assertFalse(OrderHistory.objects.exists())
+
+    def test_rejects_overlong_and_non_string_variants(self):
+        for variant in ['x' * 500, 5, ['100g']]:
+            response = self.checkout([{'product_id': self.product.pk, 'variant': variant, 'quantity': 1}])
+            self.assertEqual(response.status_code, 400, variant)
+        self.assertFalse(OrderHistory.objects.exists())
+
+    def test_rejects_non_numeric_address_id(self):
+        response = self.checkout([{'product_id': self.product.pk, 'quantity': 1}], address_id='abc')
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_users_address_is_not_found(self):
+        other = make_address(make_user('9000000002'))
+        response = self.checkout([{'product_id': self.product.pk, 'quantity': 1}], address_id=other.pk)
+        self.assertEqual(response.status_code, 404)
+
+    def test_unknown_product_is_not_found(self):
+        response = self.checkout([{'product_id': self.product.pk + 100, 'quantity': 1}])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['missing_ids'], [self.product.pk + 100])
@@ -0,0 +1,86 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.fast import FastJSONRenderer
+from api.models import OrderHistory, Product, Review
+
+from .utils import client_for, make_address, make_product, make_user
+
+API = '/api/v1/'
+# No response cache, so every request runs the list code
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+# Payloads JSONRenderer and FastJSONRenderer must encode to the same bytes
+RENDER_SAMPLES = [
+    {'text': 'plain', 'number': 1, 'float': 2.5, 'none': None, 'list': [True, False]},
+    {'text': 'Bhujia भुजिया — ₹120 \U0001f60b'},
+    {'text': 'line\u2028separator\u2029paragraph', 'control': '\x00\x1f\t\n"\\/'},
+    {'nested': {'deep': [{'a': [1, 2, {'b': None}]}]}, 'empty': {}, 'empty_list': []},
+]
+
+
+class FastRendererTests(TestCase):
+    def test_encodes_like_the_json_renderer(self):
+        for data in RENDER_SAMPLES:
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data), data)
+
+
+@override_settings(CACHES=NO_CACHE)
+class FastListTests(TestCase):
+    """The fast list path must return byte-for-byte the serializer path's JSON, on every page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        address = make_address(cls.user)
+        products = [
+            make_product(name='Bhujia', variants=['100g', '500g'], mrp=120.5),
+            make_product(name='भुजिया मसाला', variants=['1kg'], mrp=99),
+            make_product(name='Namkeen "Mix"', variants=['100g', '200g', '5kg']),
+            make_product(name='Papad', variants=['2kg'], mrp=45.25),
+        ]
+        Product.objects.filter(pk=products[0].pk).update(image_derivatives={
+            'source': 'ecom/images/bhujia.jpg',
+            'jpg': {'320': 'ecom/derived/bhujia-320w.a1.jpg'}, 'webp': {'320': 'ecom/derived/bhujia-320w.b2.webp'},
+        })
+        for number, (product, star) in enumerate([(products[0], '5'), (products[0], '3'), (products[2], '4')]):
+            reviewer = make_user(phone=f'90000002{number:02d}')
+            Review.objects.create(product=product, user=reviewer, star=star, content=f'Tasty \u2028 ₹ "{number}"')
+        for number, product in enumerate(products * 2):
+            OrderHistory.objects.create(
+                user=cls.user, address=address if number % 2 else None, product=product,
+                variant=product.product_variant[0], qty=number + 1,
+                status='DELIVERED' if number % 3 == 0 else 'PENDING',
+                delivery_date=timezone.now() if number % 3 == 0 else None,
+            )
+
+    def setUp(self):
+        self.client = client_for(self.user)
+
+    def get(self, url, fast):
+        with override_settings(API_FAST_LISTS=fast):
+            return self.client.get(url)
+
+    def assert_same_pages(self, url):
+        pages = 0
+        while url:
+            expected, actual = self.get(url, fast=False), self.get(url, fast=True)
+            self.assertEqual(expected.status_code, 200)
+            self.assertEqual(actual.content, expected.content, url)
+            url = expected.json()['next']
+            pages += 1
+        self.assertGreater(pages, 1)
+
+    def test_products(self):
+        self.assert_same_pages(f'{API}Product/?page_size=3')
+
+    def test_products_by_rating(self):
+        self.assert_same_pages(f'{API}Product/?page_size=3&ordering=rating')
+        self.assert_same_pages(f'{API}Product/?page_size=3&ordering=-rating')
+
+    def test_reviews(self):
+        self.assert_same_pages(f'{API}Review/?page_size=2')
+
+    def test_orders(self):
+        self.assert_same_pages(f'{API}orders/?page_size=3')
@@ -0,0 +1,43 @@
+import os
+
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
+from django.test import TestCase
+from django.utils.dateparse import parse_datetime
+
+from api.cache import get_catalogue_version
+from api.models import DailySales, OrderHistory, Product
+
+
+class GenerateDataTests(TestCase):
+    def test_invalidates_the_catalogue_cache(self):
+        version = get_catalogue_version()
+        call_command(
+            'generate_data', products=3, users=5, orders=20, reviews=5, carts=5, processes=1,
+            stdout=open(os.devnull, 'w'),
+        )
+        self.assertEqual(Product.objects.count(), 3)
+        self.assertEqual(OrderHistory.objects.count(), 20)
+        self.assertNotEqual(get_catalogue_version(), version)
+
+    def test_the_same_seed_and_as_of_give_the_same_rows(self):
+        def generate():
+            call_command(
+                'generate_data', users=5, orders=20, reviews=5, carts=5, processes=1, seed=7,
+                as_of='2025-01-31T12:00:00+05:30', stdout=open(os.devnull, 'w'),
+            )
+            orders = list(OrderHistory.objects.order_by('id').values_list(
+                'product_id', 'variant', 'qty', 'order_date', 'delivery_date', 'status', 'bill_amount',
+            ))
+            self.assertEqual(DailySales.objects.aggregate(total=Sum('orders'))['total'], 20)
+            OrderHistory.objects.all().delete()
+            return orders
+
+        call_command('generate_data', products=3, users=0, orders=0, reviews=0, carts=0, stdout=open(os.devnull, 'w'))
+        first = generate()
+        self.assertEqual(generate(), first)
+        self.assertLessEqual(max(order[3] for order in first), parse_datetime('2025-01-31T12:00:00+05:30'))
+
+    def test_rejects_a_bad_as_of(self):
+        with self.assertRaises(CommandError):
+            call_command('generate_data', users=0, as_of='yesterday', stdout=open(os.devnull, 'w'))
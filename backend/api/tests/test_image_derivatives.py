@@ -0,0 +1,54 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from api.models import Product
+
+from .utils import make_product
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def upload(self, size):
+        buffer = io.BytesIO()
+        Image.new('RGB', size, 'orange').save(buffer, 'PNG')
+        return default_storage.save('ecom/images/bhujia.png', ContentFile(buffer.getvalue()))
+
+    def test_derivatives_are_built_after_commit(self):
+        product = make_product()
+        product.product_image = self.upload((400, 300))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            product.save()
+            self.assertEqual(Product.objects.get(pk=product.pk).image_derivatives, {})
+        for callback in callbacks:
+            callback()
+
+        derivatives = Product.objects.get(pk=product.pk).image_derivatives
+        self.assertEqual(derivatives['source'], product.product_image.name)
+        self.assertEqual(list(derivatives['webp']), ['320'])
+
+    def test_a_decompression_bomb_does_not_break_the_save(self):
+        product = make_product()
+        product.product_image = self.upload((400, 300))
+
+        # 400x300 is more than twice the limit, so Pillow raises DecompressionBombError
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 1000), self.assertLogs('api.models', 'WARNING'), \
+                self.captureOnCommitCallbacks(execute=True):
+            product.save()
+
+        product.refresh_from_db()
+        self.assertEqual(product.image_derivatives, {})
+        self.assertTrue(product.product_image.name)
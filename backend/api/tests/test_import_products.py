@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DataError
+from django.test import TestCase
+
+from api.models import Product, ProductVariantPrice
+
+
+class ImportProductsTests(TestCase):
+    def import_jsonl(self, lines):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'products.jsonl')
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write('\n'.join(lines) + '\n')
+        call_command('import_products', path, stdout=open(os.devnull, 'w'))
+        errors_path = f'{path}.errors.jsonl'
+        if not os.path.exists(errors_path):
+            return []
+        with open(errors_path, encoding='utf-8') as handle:
+            return [json.loads(line) for line in handle]
+
+    def test_malformed_lines_are_rejected_and_the_rest_imported(self):
+        good = {'product_name': 'Bhujia', 'product_variant': '100g|1kg', 'product_mrp': 120}
+        errors = self.import_jsonl([
+            json.dumps(good),
+            '{"product_name": "Broken',
+            '[1, 2]',
+            json.dumps({**good, 'product_name': 'Namkeen'}),
+        ])
+
+        self.assertEqual(sorted(Product.objects.values_list('product_name', flat=True)), ['Bhujia', 'Namkeen'])
+        self.assertEqual([error['line'] for error in errors], [2, 3])
+        self.assertEqual(errors[0]['row'], '{"product_name": "Broken')
+        self.assertIn('invalid JSON', errors[0]['error'])
+
+    def test_non_finite_mrp_and_long_image_names_are_rejected(self):
+        good = {'product_name': 'Bhujia', 'product_variant': '100g', 'product_mrp': 120}
+        errors = self.import_jsonl([
+            json.dumps({**good, 'product_mrp': 'nan'}),
+            json.dumps({**good, 'product_mrp': 'inf'}),
+            json.dumps({**good, 'product_image': 'ecom/images/' + 'x' * 100 + '.jpg'}),
+            json.dumps(good),
+        ])
+
+        self.assertEqual(list(Product.objects.values_list('product_name', flat=True)), ['Bhujia'])
+        self.assertEqual([error['line'] for error in errors], [1, 2, 3])
+        self.assertIn('product_image', errors[2]['error'])
+
+    def test_a_database_error_rejects_only_its_row(self):
+        bulk_create = ProductVariantPrice.objects.bulk_create
+
+        def failing_bulk_create(objs, *args, **kwargs):
+            if any(price.product.product_name == 'Broken' for price in objs):
+                raise DataError("value too long")
+            return bulk_create(objs, *args, **kwargs)
+
+        good = {'product_name': 'Bhujia', 'product_variant': '100g', 'product_mrp': 120}
+        with mock.patch.object(ProductVariantPrice.objects, 'bulk_create', side_effect=failing_bulk_create):
+            errors = self.import_jsonl([
+                json.dumps(good),
+                json.dumps({**good, 'product_name': 'Broken'}),
+                json.dumps({**good, 'product_name': 'Namkeen'}),
+            ])
+
+        self.assertEqual(sorted(Product.objects.values_list('product_name', flat=True)), ['Bhujia', 'Namkeen'])
+        self.assertEqual(ProductVariantPrice.objects.count(), 2)
+        self.assertEqual([(error['line'], error['error']) for error in errors], [(2, 'value too long')])
@@ -0,0 +1,42 @@
+import asyncio
+import re
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from api.metrics import time_query
+
+from .utils import make_product
+
+TIMING = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries", serialize;dur=([\d.]+), app;dur=[\d.]+, render;dur=[\d.]+')
+
+
+def timing(response):
+    match = TIMING.match(response['Server-Timing'])
+    return int(match.group(1)), float(match.group(2))
+
+
+@override_settings(CATALOGUE_CACHE_TIMEOUT=0)
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(30):
+            make_product(f'Product {index}', variants=['100g', '500g'])
+
+    def test_reports_serializer_time_on_both_list_paths(self):
+        for fast in (False, True):
+            with self.settings(API_FAST_LISTS=fast):
+                queries, serialize = timing(self.client.get('/api/v1/Product/?page_size=30'))
+            self.assertGreater(queries, 0)
+            self.assertGreater(serialize, 0, fast)
+
+    def test_one_wrapper_per_connection(self):
+        for _ in range(3):
+            self.client.get('/api/v1/Product/')
+        self.assertEqual(connection.execute_wrappers.count(time_query), 1)
+
+    async def test_concurrent_async_requests_count_only_their_own_queries(self):
+        url = '/api/v1/async/Product/?page_size=30'
+        alone, _ = timing(await self.async_client.get(url))
+        responses = await asyncio.gather(*(self.async_client.get(url) for _ in range(8)))
+        self.assertEqual([timing(response)[0] for response in responses], [alone] * 8)
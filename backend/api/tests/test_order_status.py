@@ -0,0 +1,100 @@
+from django.test import TestCase
+
+from api.models import OrderHistory, ProductStock
+
+from .utils import client_for, make_product, make_user
+
+BULK_STATUS = '/api/v1/orders/bulk-status/'
+
+
+def make_order(user, product, status='PENDING'):
+    return OrderHistory.objects.create(
+        user=user, address=None, product=product, variant='100g', qty=1, bill_amount=100, status=status,
+    )
+
+
+class OrderStatusTests(TestCase):
+    def setUp(self):
+        self.user = make_user(is_staff=True)
+        self.product = make_product()
+        self.client = client_for(self.user)
+
+    def patch(self, order, data, client=None):
+        return (client or self.client).patch(f'/api/v1/orders/{order.pk}/', data, format='json')
+
+    def test_patch_follows_the_transition_table(self):
+        order = make_order(self.user, self.product)
+        self.assertEqual(self.patch(order, {'status': 'shipped'}).status_code, 400)
+        self.assertEqual(self.patch(order, {'status': 'LOST'}).status_code, 400)
+
+        response = self.patch(order, {'status': 'processing'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'PROCESSING')
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'PROCESSING')
+
+    def test_patch_cannot_reopen_a_cancelled_order(self):
+        order = make_order(self.user, self.product, status='CANCELLED')
+        response = self.patch(order, {'status': 'PENDING'})
+        self.assertEqual(response.status_code, 400)
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'CANCELLED')
+
+
+class OwnerOrderTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.product = make_product()
+        self.client = client_for(self.user)
+        ProductStock.objects.set_stock(self.product.pk, '100g', 10)
+
+    def patch(self, order, data):
+        return self.client.patch(f'/api/v1/orders/{order.pk}/', data, format='json')
+
+    def stock(self):
+        return ProductStock.objects.get(product=self.product, variant='100g').stock
+
+    def test_owner_cannot_change_status_or_bill(self):
+        order = make_order(self.user, self.product)
+        self.assertEqual(self.patch(order, {'status': 'CANCELLED'}).status_code, 403)
+        self.assertEqual(self.patch(order, {'bill_amount': 1}).status_code, 200)
+        order.refresh_from_db()
+        self.assertEqual((order.status, order.bill_amount), ('PENDING', 100))
+
+    def test_reopening_a_cancelled_order_does_not_return_stock_again(self):
+        order = make_order(self.user, self.product)
+        OrderHistory.objects.transition(OrderHistory.objects.filter(pk=order.pk), 'CANCELLED')
+        self.assertEqual(self.stock(), 11)
+        for status in ['PENDING', 'CANCELLED'] * 3:
+            self.patch(order, {'status': status})
+        order.status = 'PENDING'
+        order.save()
+        order.status = 'CANCELLED'
+        order.save()
+        self.assertEqual(self.stock(), 11)
+
+
+class BulkStatusFilterTests(TestCase):
+    def setUp(self):
+        self.staff = make_user(is_staff=True)
+        self.product = make_product()
+        self.client = client_for(self.staff)
+
+    def test_status_filter_accepts_a_list_or_a_string(self):
+        pending = make_order(self.staff, self.product)
+        shipped = make_order(self.staff, self.product, status='SHIPPED')
+        for status_filter in (['pending'], 'pending'):
+            response = self.client.post(BULK_STATUS, {
+                'status': 'CANCELLED', 'filter': {'status': status_filter},
+            }, format='json')
+            self.assertEqual(response.status_code, 200)
+        pending.refresh_from_db()
+        shipped.refresh_from_db()
+        self.assertEqual((pending.status, shipped.status), ('CANCELLED', 'SHIPPED'))
+
+    def test_non_string_status_filter_is_a_bad_request(self):
+        for status_filter in ([1], {'PENDING': True}, 5):
+            response = self.client.post(BULK_STATUS, {
+                'status': 'CANCELLED', 'filter': {'status': status_filter},
+            }, format='json')
+            self.assertEqual(response.status_code, 400, status_filter)
@@ -0,0 +1,69 @@
+import json
+from base64 import urlsafe_b64encode
+
+from django.test import TestCase, override_settings
+
+from api.models import Product, ProductRating
+
+from .utils import make_product
+
+PRODUCTS = '/api/v1/Product/'
+
+
+def cursor(position, reverse=False):
+    payload = json.dumps({'p': position, 'r': int(reverse)}).encode()
+    return urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+@override_settings(CATALOGUE_CACHE_TIMEOUT=0)
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(7):
+            make_product(f'Product {index}')
+
+    def test_walks_every_row_once_forward_and_back(self):
+        seen, url = [], f'{PRODUCTS}?page_size=3'
+        while url:
+            page = self.client.get(url).json()
+            seen += [product['id'] for product in page['results']]
+            last, url = page, page['next']
+        self.assertEqual(seen, list(Product.objects.order_by('product_name', 'id').values_list('id', flat=True)))
+
+        back = self.client.get(last['previous']).json()
+        self.assertEqual([product['id'] for product in back['results']], seen[3:6])
+
+    def test_page_size_is_capped(self):
+        with self.settings(API_MAX_PAGE_SIZE=2):
+            self.assertEqual(len(self.client.get(f'{PRODUCTS}?page_size=50').json()['results']), 2)
+
+    def test_tampered_cursors_are_not_found(self):
+        for value in ['not-base64!', cursor(['Product 1']), cursor(['Product 1', 'abc']),
+                      cursor(['Product 1', 10 ** 30]), cursor(['Product 1', str(10 ** 30)]),
+                      cursor([['x'], '1'])]:
+            self.assertEqual(self.client.get(f'{PRODUCTS}?cursor={value}').status_code, 404, value)
+
+    def test_rating_order_walks_every_product(self):
+        ProductRating.objects.filter(product__product_name__in=['Product 2', 'Product 5']).update(average=4.5)
+        expected = list(Product.objects.order_by('-rating__average', '-id').values_list('id', flat=True))
+        for url in [f'{PRODUCTS}?ordering=-rating&page_size=3', f'/api/v1/async/Product/?ordering=-rating&page_size=3']:
+            seen = []
+            while url:
+                page = self.client.get(url).json()
+                seen += [product['id'] for product in page['results']]
+                url = page['next']
+            self.assertEqual(seen, expected, url)
+
+    def test_tampered_rating_cursor_is_not_found(self):
+        response = self.client.get(f'{PRODUCTS}?ordering=rating&cursor={cursor(["high", "1"])}')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CATALOGUE_CACHE_TIMEOUT=0)
+class AsyncPaginationTests(TestCase):
+    def test_bad_cursor_is_a_json_404(self):
+        product = make_product()
+        for url in ['/api/v1/async/Product/', f'/api/v1/async/Product/{product.pk}/reviews/']:
+            response = self.client.get(f'{url}?cursor=not-a-cursor')
+            self.assertEqual(response.status_code, 404, url)
+            self.assertEqual(response.json(), {'detail': 'Invalid cursor'})
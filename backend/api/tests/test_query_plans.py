@@ -0,0 +1,107 @@
+import json
+import random
+from unittest import skipUnless
+
+from django.contrib.auth import authenticate
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.management.commands._seed import SEED_PASSWORD, seed
+from api.models import Cart, CustomUser, OrderHistory, Product
+from api.views import AddressViewSet, CartViewSet, OrderHistoryViewSet, ProductViewSet, ReviewViewSet
+
+
+def list_queryset(viewset, user=None, params=None):
+    """The queryset `viewset`'s list action runs, sliced to a page as the API does."""
+    request = APIRequestFactory().get('/', params or {})
+    if user is not None:
+        force_authenticate(request, user)
+    view = viewset(action_map={'get': 'list'}, format_kwarg=None, args=(), kwargs={})
+    view.request = view.initialize_request(request)
+    queryset = view.filter_queryset(view.get_queryset())
+    if view.paginator is not None:
+        queryset = view.paginator.page_queryset(queryset, view.request)
+    return queryset
+
+
+def scans(plan):
+    """(node type, relation, index or None) for every table access in an EXPLAIN (FORMAT JSON) plan."""
+    if 'Relation Name' in plan:
+        yield plan['Node Type'], plan['Relation Name'], plan.get('Index Name')
+    for child in plan.get('Plans', []):
+        yield from scans(child)
+
+
+@skipUnless(connection.vendor == 'postgresql', "Query plans are checked on PostgreSQL")
+class QueryPlanTests(TestCase):
+    """
+    Seed enough rows that the planner prefers an index wherever one fits, then
+    check that the main query of each hot endpoint does not scan its table.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        users = seed(products=3000, users=5000, orders=60000, reviews=20000, rng=rng)
+        products = list(Product.objects.values_list('id', 'product_variant'))
+        Cart.objects.bulk_create([
+            Cart(user=user, product_id=product_id, variant=variants[0], qty=1)
+            for user in users
+            for product_id, variants in rng.sample(products, 3)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        cls.user = CustomUser.objects.filter(orders__isnull=False).first()
+        cls.product = Product.objects.filter(review__isnull=False).first()
+
+    def assertIndexed(self, queryset, index=None):
+        """No Seq Scan of the queryset's table, and `index` used if given."""
+        table = queryset.model._meta.db_table
+        plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+        accesses = list(scans(plan))
+        self.assertIn(table, [relation for _, relation, _ in accesses])
+        self.assertNotIn(('Seq Scan', table), [(node, relation) for node, relation, _ in accesses],
+                         json.dumps(plan, indent=2))
+        if index is not None:
+            self.assertIn(index, [name for _, _, name in accesses], json.dumps(plan, indent=2))
+
+    def test_order_history(self):
+        self.assertIndexed(list_queryset(OrderHistoryViewSet, self.user))
+
+    def test_open_orders(self):
+        self.assertIndexed(OrderHistory.objects.filter(status='PROCESSING').order_by('order_date')[:25])
+
+    def test_cart(self):
+        self.assertIndexed(list_queryset(CartViewSet, self.user))
+
+    def test_addresses(self):
+        self.assertIndexed(list_queryset(AddressViewSet, self.user))
+
+    def test_reviews_of_a_product(self):
+        self.assertIndexed(list_queryset(ReviewViewSet, params={'product': self.product.pk}))
+
+    def test_reviews(self):
+        self.assertIndexed(list_queryset(ReviewViewSet))
+
+    def test_products(self):
+        self.assertIndexed(list_queryset(ProductViewSet))
+
+    def test_products_by_rating(self):
+        # The INNER join from ProductViewSet.order_queryset lets the rating index drive both directions
+        for ordering in ['-rating', 'rating']:
+            with self.subTest(ordering=ordering):
+                self.assertIndexed(list_queryset(ProductViewSet, params={'ordering': ordering}), 'rating_average_idx')
+
+    def test_login_lookup(self):
+        # The authentication backend's own query, for a phone and an email
+        for identifier in [self.user.phone_number, self.user.email]:
+            with CaptureQueriesContext(connection) as queries:
+                self.assertIsNotNone(authenticate(username=identifier, password=SEED_PASSWORD))
+            lookup = next(query['sql'] for query in queries if 'FROM "api_customuser"' in query['sql'])
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {lookup}")
+                plan = cursor.fetchone()[0][0]['Plan']
+            self.assertNotIn(('Seq Scan', 'api_customuser'), [(node, relation) for node, relation, _ in scans(plan)],
+                             json.dumps(plan, indent=2))
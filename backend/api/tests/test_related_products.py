@@ -0,0 +1,29 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from api.models import OrderHistory
+from api.views import ProductViewSet
+
+from .utils import make_product, make_user
+
+
+def buy(user, product, times=1):
+    for _ in range(times):
+        OrderHistory.objects.create(user=user, product=product, variant='100g', qty=1, bill_amount=100)
+
+
+class RelatedProductsTests(TestCase):
+    def test_counts_distinct_recent_buyers_not_orders(self):
+        product, shared, single = make_product('Bhujia'), make_product('Namkeen'), make_product('Papad')
+        early, middle, frequent = make_user('9000000011'), make_user('9000000012'), make_user('9000000013')
+        for user in (early, middle):
+            buy(user, shared)
+            buy(user, product)
+        buy(frequent, single)
+        # The most recent orders all come from one buyer; they must not crowd out the others
+        buy(frequent, product, times=3)
+
+        with mock.patch.object(ProductViewSet, 'related_buyers', 3):
+            related = ProductViewSet().related_ids(product.pk)
+        self.assertEqual(related[:2], [shared.pk, single.pk])
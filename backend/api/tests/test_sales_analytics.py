@@ -0,0 +1,39 @@
+from django.test import TestCase
+
+from api.models import OrderHistory
+
+from .utils import client_for, make_product, make_user
+
+SALES = '/api/v1/analytics/sales/'
+
+
+class SalesAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = make_user(is_staff=True)
+        cls.bhujia, cls.papad = make_product('Bhujia', variants=['100g']), make_product('Papad', variants=['100g'])
+        for product, status in [(cls.bhujia, 'PENDING'), (cls.bhujia, 'DELIVERED'), (cls.papad, 'DELIVERED')]:
+            OrderHistory.objects.create(user=cls.staff, product=product, variant='100g', qty=2, status=status)
+
+    def setUp(self):
+        self.client = client_for(self.staff)
+
+    def totals(self, query):
+        response = self.client.get(f'{SALES}?{query}')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data['totals']['orders']
+
+    def test_filters_by_product_and_status(self):
+        self.assertEqual(self.totals(f'product={self.bhujia.pk}'), 2)
+        self.assertEqual(self.totals(f'product={self.bhujia.pk},{self.papad.pk},'), 3)
+        self.assertEqual(self.totals('status=delivered'), 2)
+        self.assertEqual(self.totals(f'product={self.bhujia.pk}&status=PENDING,DELIVERED'), 2)
+
+    def test_malformed_product_is_a_bad_request(self):
+        for product in ['abc', ',', '1,abc', '-1', str(2 ** 63)]:
+            self.assertEqual(self.client.get(f'{SALES}?product={product}').status_code, 400, product)
+
+    def test_unknown_status_is_a_bad_request(self):
+        response = self.client.get(f'{SALES}?status=PENDING,FOO')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('FOO', response.data['error'])
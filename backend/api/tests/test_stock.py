@@ -0,0 +1,92 @@
+import threading
+from unittest import skipIf
+
+from django.db import connection
+from django.db.models import Min, Sum
+from django.test import TestCase, TransactionTestCase
+
+from api.models import OrderHistory, OutOfStock, ProductStock, StockReservation
+
+from .utils import client_for, make_address, make_product, make_user
+
+CHECKOUT = '/api/v1/orders/create/'
+
+
+class TakeStockTests(TestCase):
+    def setUp(self):
+        self.product = make_product()
+        self.sku = (self.product.pk, '100g')
+
+    def stock(self):
+        return list(ProductStock.objects.filter(product=self.product, variant='100g').order_by('shard').values_list('stock', flat=True))
+
+    def test_takes_across_shards_when_no_single_shard_holds_enough(self):
+        ProductStock.objects.set_stock(*self.sku, 9, shards=3)
+        ProductStock.objects.take({self.sku: 2})
+        self.assertEqual(sum(self.stock()), 7)
+        ProductStock.objects.take({self.sku: 7})
+        self.assertEqual(self.stock(), [0, 0, 0])
+        with self.assertRaises(OutOfStock):
+            ProductStock.objects.take({self.sku: 1})
+
+    def test_negative_quantities_are_put_back(self):
+        other = make_product(name='Namkeen')
+        ProductStock.objects.set_stock(*self.sku, 5)
+        ProductStock.objects.set_stock(other.pk, '100g', 5)
+        ProductStock.objects.take({self.sku: 2, (other.pk, '100g'): -3})
+        self.assertEqual(self.stock(), [3])
+        self.assertEqual(ProductStock.objects.get(product=other).stock, 8)
+
+    def test_a_new_hold_takes_only_the_difference(self):
+        user = make_user()
+        ProductStock.objects.set_stock(*self.sku, 10)
+        StockReservation.objects.reserve(user, {self.sku: 4})
+        StockReservation.objects.reserve(user, {self.sku: 1})
+        self.assertEqual(self.stock(), [9])
+        StockReservation.objects.consume(user, {self.sku: 3})
+        self.assertEqual(self.stock(), [7])
+        self.assertFalse(StockReservation.objects.exists())
+
+
+@skipIf(connection.vendor == 'sqlite', "SQLite fails concurrent write transactions instead of waiting")
+class ConcurrentCheckoutTests(TransactionTestCase):
+    buyers = 8
+    orders_per_buyer = 4
+    stock = 20
+
+    def test_concurrent_checkouts_never_oversell(self):
+        product = make_product()
+        ProductStock.objects.set_stock(product.pk, '100g', self.stock, shards=4)
+        buyers = []
+        for number in range(self.buyers):
+            user = make_user(phone=f'90000001{number:02d}')
+            buyers.append((client_for(user), make_address(user).pk))
+        statuses, lock = [], threading.Lock()
+        start = threading.Barrier(self.buyers)
+
+        def buy(client, address_id):
+            try:
+                start.wait()
+                codes = [
+                    client.post(CHECKOUT, {
+                        'address_id': address_id,
+                        'items': [{'product_id': product.pk, 'variant': '100g', 'quantity': 1}],
+                    }, format='json').status_code
+                    for _ in range(self.orders_per_buyer)
+                ]
+                with lock:
+                    statuses.extend(codes)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=buy, args=buyer) for buyer in buyers]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(sorted(set(statuses)), [201, 409])
+        self.assertEqual(statuses.count(201), self.stock)
+        self.assertEqual(OrderHistory.objects.count(), self.stock)
+        left = ProductStock.objects.filter(product=product).aggregate(total=Sum('stock'), lowest=Min('stock'))
+        self.assertEqual(left, {'total': 0, 'lowest': 0})
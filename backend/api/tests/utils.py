@@ -0,0 +1,30 @@
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.models import Address, CustomUser, Product
+
+
+def make_user(phone='9000000001', **fields):
+    return CustomUser.objects.create_user(phone, password='password', first_name='Test', last_name='User', **fields)
+
+
+def make_address(user):
+    return Address.objects.create(
+        user=user, address_lane1='1 Main Road', address_city='Jaipur', address_district='Jaipur',
+        address_state='Rajasthan', address_pincode='302001',
+    )
+
+
+def make_product(name='Bhujia', variants=('100g', '500g'), mrp=100):
+    """A product whose variants all get a ProductVariantPrice row, so none falls back to the MRP."""
+    unpriced = set(variants) - set(Product.VARIANT_MULTIPLIER)
+    if unpriced:
+        raise ValueError(f"{sorted(unpriced)} are not variants in Product.PRODUCT_VARIANT")
+    return Product.objects.create(product_name=name, product_variant=list(variants), product_mrp=mrp)
+
+
+def client_for(user):
+    """An API client that authenticates as `user` with a token, as the frontend does."""
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get_or_create(user=user)[0].key}')
+    return client
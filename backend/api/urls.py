@@ -1,9 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework import routers
+from api import async_views
 from api.views import (
     ProductViewSet, CartViewSet, AddressViewSet, OrderHistoryViewSet,
-    ReviewViewSet, ContactViewSet, RegisterView, LoginView, ProfileView
+    ReviewViewSet, ContactViewSet, RegisterView, LoginView, LogoutView, ProfileView,
+    SalesAnalyticsView, MetricsView
 )
 
 router = routers.DefaultRouter()
@@ -22,5 +24,16 @@ urlpatterns = [
     # Authentication endpoints
     path('signup/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
+    path('logout/', LogoutView.as_view(), name='logout'),
     path('profile/', ProfileView.as_view(), name='profile'),
+
+    # Staff analytics
+    path('analytics/sales/', SalesAnalyticsView.as_view(), name='sales-analytics'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+
+    # Async catalogue reads (served natively under ASGI)
+    path('async/Product/', async_views.product_list, name='async-product-list'),
+    path('async/Product/<int:pk>/', async_views.product_detail, name='async-product-detail'),
+    path('async/Product/<int:pk>/reviews/', async_views.product_reviews, name='async-product-reviews'),
+    path('async/Product/<int:pk>/rating/', async_views.product_rating, name='async-product-rating'),
 ]
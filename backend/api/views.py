@@ -2,9 +2,26 @@ from rest_framework import viewsets, generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.authtoken.models import Token
+from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
-from .models import Product, Cart, OrderHistory, Review, ContactForm, Address
+from django.db import DataError, IntegrityError, transaction
+from django.db.models import Count, F, Max, Prefetch, Sum
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .models import (
+    Product, Cart, DailySales, OrderHistory, Review, ContactForm, Address, OutOfStock, StockReservation
+)
+from .cache import CatalogueCacheMixin
+from .exports import order_csv_chunks, parse_ids, parse_order_filters, parse_statuses
+from .fast import FastListMixin
+from .metrics import registry
+from .pagination import KeysetPagination
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.reverse import reverse
+from rest_framework.utils.urls import replace_query_param
 from .serializers import (
     ProductSerializer, CartSerializer, OrderHistorySerializer,
     ReviewSerializer, ContactFormSerializer, AddressSerializer,
@@ -13,31 +30,187 @@ from .serializers import (
 
 User = get_user_model()
 
+
+def order_lines(items):
+    """[(product_id, variant, qty)] from a checkout payload; raises ValueError."""
+    lines = []
+    try:
+        for item in items:
+            qty = int(item.get('quantity', 1))
+            if qty < 1:
+                raise ValueError
+            variant = item.get('variant') or '100g'
+            if not isinstance(variant, str):
+                raise ValueError
+            lines.append((int(item['product_id']), variant, qty))
+    except (AttributeError, KeyError, TypeError, ValueError):
+        raise ValueError('Each item needs a product_id and a positive quantity')
+    return lines
+
+
+def unavailable_variants(lines, products):
+    """Response for lines whose variant the product is not sold in, or None."""
+    unavailable = [
+        {'product_id': product_id, 'variant': variant}
+        for product_id, variant, _ in lines
+        if variant not in products[product_id].product_variant
+    ]
+    if not unavailable:
+        return None
+    return Response(
+        {'error': 'Variant not available', 'items': unavailable},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
+def line_quantities(lines):
+    """Total quantity per (product_id, variant)."""
+    quantities = {}
+    for product_id, variant, qty in lines:
+        quantities[(product_id, variant)] = quantities.get((product_id, variant), 0) + qty
+    return quantities
+
+
+def out_of_stock(error):
+    return Response({
+        'error': 'Out of stock',
+        'product_id': error.product_id,
+        'variant': error.variant,
+    }, status=status.HTTP_409_CONFLICT)
+
+
 # -----------------------------
 # MODEL VIEWSETS (CRUD APIs)
 # -----------------------------
 
-class ProductViewSet(viewsets.ModelViewSet):
-    """Products listing and details."""
+class ProductViewSet(CatalogueCacheMixin, FastListMixin, viewsets.ModelViewSet):
+    """
+    Products listing and details. `?ordering=rating|-rating` sorts by average rating;
+    `?ids=1,2,3` fetches just those products.
+    """
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [permissions.AllowAny]  # Products visible to everyone
+    pagination_class = KeysetPagination
+    orderings = {
+        'rating': ['rating__average', 'id'],
+        '-rating': ['-rating__average', '-id'],
+    }
+    # The product page's related products, and how many recent buyers they are drawn from
+    related_count = 4
+    related_buyers = 200
+
+    @classmethod
+    def order_queryset(cls, queryset, ordering):
+        """Apply `?ordering=`; async_views.product_list shares this."""
+        ordering = cls.orderings.get(ordering)
+        if not ordering:
+            return queryset
+        # Every product has a rating row (the post_save signal, import_products and
+        # rebuild create it), so requiring one drops nothing; it makes the join
+        # INNER, which lets rating_average_idx drive the sort instead of a full scan
+        return queryset.filter(rating__isnull=False).order_by(*ordering)
+
+    def get_queryset(self):
+        queryset = Product.objects.select_related('rating').prefetch_related('prices')
+        return self.order_queryset(queryset, self.request.query_params.get('ordering'))
+
+    def list(self, request, *args, **kwargs):
+        if 'ids' in request.query_params:
+            return self.cached_response(request, self.list_ids)
+        return super().list(request, *args, **kwargs)
+
+    def list_ids(self, request):
+        """`?ids=3,1,2`: those products in the order asked for, in one query, plus any missing ids"""
+        try:
+            ids = list(dict.fromkeys(int(pk) for pk in request.query_params['ids'].split(',') if pk.strip()))
+        except ValueError:
+            ids = None
+        if not ids or len(ids) > settings.API_MAX_PAGE_SIZE:
+            return Response(
+                {'error': f'ids must be 1 to {settings.API_MAX_PAGE_SIZE} comma-separated product ids'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        products = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer([products[pk] for pk in ids if pk in products], many=True)
+        return Response({
+            'results': serializer.data,
+            'missing_ids': [pk for pk in ids if pk not in products],
+        })
+
+    @action(detail=True, methods=['get'])
+    def page(self, request, pk=None):
+        """The product page in one response: the product, its first page of reviews and related products"""
+        return self.cached_response(request, self.product_page, pk)
+
+    def product_page(self, request, pk):
+        reviews = KeysetPagination()
+        # The paginator orders and slices the page; the prefetch runs it for this product only
+        first_page = reviews.page_queryset(Review.objects.all(), request)
+        product = get_object_or_404(
+            self.get_queryset().prefetch_related(Prefetch('review_set', queryset=first_page, to_attr='review_page')),
+            pk=pk,
+        )
+        reviews.set_page(product.review_page)
+        # Later pages come from the review list
+        reviews.url = replace_query_param(
+            replace_query_param(reverse('review-list', request=request), 'product', product.pk),
+            'page_size', reviews.page_size,
+        )
+
+        related_ids = self.related_ids(product.pk)
+        related = self.get_queryset().in_bulk(related_ids)
+        return Response({
+            'product': self.get_serializer(product).data,
+            'reviews': {
+                'next': reviews.get_next_link(),
+                'previous': reviews.get_previous_link(),
+                'results': ReviewSerializer(reviews.page, many=True).data,
+            },
+            'related': self.get_serializer([related[pk] for pk in related_ids if pk in related], many=True).data,
+        })
+
+    def related_ids(self, product_id):
+        """
+        Products most often bought by this product's recent buyers, topped up
+        with the best-rated products when there are too few of them.
+        """
+        # The last `related_buyers` distinct users to order it, however many orders each placed
+        buyers = (
+            OrderHistory.objects.filter(product_id=product_id).values('user_id')
+            .annotate(last_order=Max('id')).order_by('-last_order').values('user_id')[:self.related_buyers]
+        )
+        ids = list(
+            OrderHistory.objects.filter(user_id__in=buyers).exclude(product_id=product_id)
+            .values('product_id').annotate(buyers=Count('user_id', distinct=True))
+            .order_by('-buyers', 'product_id').values_list('product_id', flat=True)[:self.related_count]
+        )
+        if len(ids) < self.related_count:
+            ids += (
+                Product.objects.exclude(pk__in=[product_id, *ids])
+                .order_by(F('rating__average').desc(nulls_last=True), 'id')
+                .values_list('id', flat=True)[:self.related_count - len(ids)]
+            )
+        return ids
 
 
 class CartViewSet(viewsets.ModelViewSet):
     """Cart visible only to logged-in users."""
     serializer_class = CartSerializer
     permission_classes = [permissions.IsAuthenticated]
+    max_sync_lines = 200
 
     def get_queryset(self):
-        return Cart.objects.filter(user=self.request.user)
+        return Cart.objects.filter(user=self.request.user).select_related('product').prefetch_related('product__prices')
 
     def list(self, request, *args, **kwargs):
-        """Return cart items with nested product details"""
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        """Return cart items with nested product details and the cart total"""
+        cart_items = list(self.get_queryset())
+        serializer = self.get_serializer(cart_items, many=True)
         return Response({
-            'items': serializer.data
+            'items': serializer.data,
+            'total': round(sum(item.total_price for item in cart_items), 2)
         })
 
     def create(self, request, *args, **kwargs):
@@ -53,34 +226,45 @@ class CartViewSet(viewsets.ModelViewSet):
             )
 
         try:
-            product = Product.objects.get(id=product_id)
-        except Product.DoesNotExist:
+            product_id, quantity = int(product_id), int(quantity)
+            if quantity < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'product_id and a positive quantity are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        offered = Product.objects.filter(pk=product_id).values_list('product_variant', flat=True).first()
+        if offered is None:
             return Response(
                 {'error': 'Product not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        if variant not in offered:
+            return Response(
+                {'error': 'Variant not available', 'variants': list(offered)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Check if item already exists in cart (same product + variant)
-        cart_item = Cart.objects.filter(
-            user=request.user,
-            product=product,
-            variant=variant
-        ).first()
-
-        if cart_item:
-            # Update existing item quantity
-            cart_item.qty += int(quantity)
-            cart_item.save()
-            message = 'Cart item updated'
-        else:
-            # Create new cart item
-            cart_item = Cart.objects.create(
-                user=request.user,
-                product=product,
-                variant=variant,
-                qty=int(quantity)
+        # Single upsert: insert the line or atomically add to its quantity
+        try:
+            with transaction.atomic():
+                cart_item = Cart.objects.add_item(request.user, product_id, variant, quantity)
+        except IntegrityError:
+            # The product was deleted since the check
+            return Response(
+                {'error': 'Product not found'},
+                status=status.HTTP_404_NOT_FOUND
             )
-            message = 'Item added to cart'
+        except DataError:
+            return Response(
+                {'error': 'Invalid cart item'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        cart_item = self.get_queryset().get(pk=cart_item.pk)
+        message = 'Item added to cart' if cart_item.qty == quantity else 'Cart item updated'
 
         serializer = self.get_serializer(cart_item)
         return Response({
@@ -88,6 +272,68 @@ class CartViewSet(viewsets.ModelViewSet):
             'message': message
         }, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'], url_path='sync')
+    def sync(self, request):
+        """
+        Reconcile the whole cart in one request and return it priced, as `list`
+        does. Each item sets a line's quantity (0 removes it). With
+        "replace": true, lines that are not listed are removed as well.
+        """
+        items = request.data.get('items')
+        if not isinstance(items, list) or len(items) > self.max_sync_lines:
+            return Response(
+                {'error': f'items must be a list of at most {self.max_sync_lines} lines'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        lines = {}
+        try:
+            for item in items:
+                qty = int(item.get('quantity', 1))
+                if qty < 0:
+                    raise ValueError
+                variant = item.get('variant') or '100g'
+                if not isinstance(variant, str):
+                    raise ValueError
+                lines[(int(item['product_id']), variant)] = qty
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return Response(
+                {'error': 'Each item needs a product_id and a quantity of 0 or more'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        product_ids = {product_id for product_id, _ in lines}
+        products = Product.objects.only('id', 'product_variant').in_bulk(product_ids)
+        missing = sorted(product_ids - products.keys())
+        if missing:
+            return Response(
+                {'error': 'Product not found', 'missing_ids': missing},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        # Lines being removed (qty 0) may name a variant no longer sold
+        unavailable = unavailable_variants(
+            [(product_id, variant, qty) for (product_id, variant), qty in lines.items() if qty > 0], products,
+        )
+        if unavailable is not None:
+            return unavailable
+
+        try:
+            with transaction.atomic():
+                Cart.objects.sync(request.user, lines, replace=bool(request.data.get('replace')))
+        except IntegrityError:
+            # A product was deleted between the check and the upsert
+            return Response(
+                {'error': 'Product not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except DataError:
+            return Response(
+                {'error': 'Invalid cart item'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return self.list(request)
+
     def partial_update(self, request, *args, **kwargs):
         """Update cart item quantity"""
         try:
@@ -133,20 +379,249 @@ class AddressViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class OrderHistoryViewSet(viewsets.ModelViewSet):
+class OrderHistoryViewSet(FastListMixin, viewsets.ModelViewSet):
     """Orders and history."""
     serializer_class = OrderHistorySerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return OrderHistory.objects.filter(user=self.request.user)
+        return (
+            OrderHistory.objects.filter(user=self.request.user)
+            .select_related('product__rating', 'address')
+            .prefetch_related('product__prices')
+        )
+
+    def update(self, request, *args, **kwargs):
+        """
+        Status changes are staff-only and go through OrderHistory.objects.transition,
+        like bulk-status, so STATUS_TRANSITIONS and the stock and sales rules apply.
+        """
+        partial = kwargs.pop('partial', False)
+        order = self.get_object()
+        target = request.data.get('status')
+        data = {key: value for key, value in request.data.items() if key != 'status'}
+
+        with transaction.atomic():
+            if target is not None and str(target).upper() != order.status:
+                if not request.user.is_staff:
+                    return Response(
+                        {'error': "Only staff can change an order's status"},
+                        status=status.HTTP_403_FORBIDDEN
+                    )
+                target = str(target).upper()
+                if target not in OrderHistory.STATUS_TRANSITIONS:
+                    return Response(
+                        {'error': 'Unknown status', 'statuses': list(OrderHistory.STATUS_TRANSITIONS)},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                error = OrderHistory.objects.transition(OrderHistory.objects.filter(pk=order.pk), target)[order.pk]
+                if error:
+                    return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+                # The serializer must save the moved status, not the one read above
+                order.refresh_from_db()
+
+            serializer = self.get_serializer(order, data=data, partial=partial)
+            serializer.is_valid(raise_exception=True)
+            self.perform_update(serializer)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='create')
+    def checkout(self, request):
+        """Place an order for every line in the payload and empty the cart"""
+        address_id = request.data.get('address_id')
+        items = request.data.get('items') or []
+
+        if not address_id or not isinstance(items, list) or not items:
+            return Response(
+                {'error': 'address_id and items are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            lines = order_lines(items)
+        except ValueError as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            address_id = int(address_id)
+        except (TypeError, ValueError):
+            return Response({'error': 'address_id must be an id'}, status=status.HTTP_400_BAD_REQUEST)
+
+        address = Address.objects.filter(user=request.user, pk=address_id).first()
+        if address is None:
+            return Response(
+                {'error': 'Address not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        # One query for every product in the order
+        products = Product.objects.prefetch_related('prices').in_bulk({product_id for product_id, _, _ in lines})
+        missing = sorted({product_id for product_id, _, _ in lines} - products.keys())
+        if missing:
+            return Response(
+                {'error': 'Product not found', 'missing_ids': missing},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        unavailable = unavailable_variants(lines, products)
+        if unavailable is not None:
+            return unavailable
+
+        order_date = timezone.now()
+        orders = [
+            OrderHistory(
+                user=request.user,
+                address=address,
+                product=products[product_id],
+                variant=variant,
+                qty=qty,
+                order_date=order_date,
+                bill_amount=round(products[product_id].get_price(variant) * qty, 2),
+            )
+            for product_id, variant, qty in lines
+        ]
+
+        try:
+            with transaction.atomic():
+                StockReservation.objects.consume(request.user, line_quantities(lines))
+                orders = OrderHistory.objects.bulk_create(orders)
+                DailySales.objects.record(orders)
+                Cart.objects.filter(user=request.user).delete()
+        except OutOfStock as error:
+            return out_of_stock(error)
+        except IntegrityError:
+            # A product was deleted between the check and the insert
+            return Response({'error': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
+        except DataError:
+            return Response({'error': 'Invalid order item'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'order_id': orders[0].id,
+            'order_ids': [order.id for order in orders],
+            'bill_amount': round(sum(order.bill_amount for order in orders), 2),
+            'message': 'Order placed successfully'
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='reserve')
+    def reserve(self, request):
+        """Hold stock for the items while the user checks out; the hold lapses after STOCK_RESERVATION_MINUTES"""
+        items = request.data.get('items') or []
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'items are required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            lines = order_lines(items)
+        except ValueError as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        products = Product.objects.only('id', 'product_variant').in_bulk({product_id for product_id, _, _ in lines})
+        missing = sorted({product_id for product_id, _, _ in lines} - products.keys())
+        if missing:
+            return Response(
+                {'error': 'Product not found', 'missing_ids': missing},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        unavailable = unavailable_variants(lines, products)
+        if unavailable is not None:
+            return unavailable
+        quantities = line_quantities(lines)
 
+        # Abandoned holds are also released by the release_reservations command
+        StockReservation.objects.release_expired(limit=100)
+        try:
+            with transaction.atomic():
+                expires_at = StockReservation.objects.reserve(request.user, quantities)
+        except OutOfStock as error:
+            return out_of_stock(error)
+        except IntegrityError:
+            return Response({'error': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
+        except DataError:
+            return Response({'error': 'Invalid order item'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'expires_at': expires_at,
+            'items': [
+                {'product_id': product_id, 'variant': variant, 'quantity': qty}
+                for (product_id, variant), qty in quantities.items()
+            ],
+        }, status=status.HTTP_201_CREATED)
 
-class ReviewViewSet(viewsets.ModelViewSet):
-    """Product reviews."""
+    @action(detail=False, methods=['post'], url_path='bulk-status', permission_classes=[permissions.IsAdminUser])
+    def bulk_status(self, request):
+        """
+        Staff-only: move many orders to `status` at once. Select them with `ids`
+        or with `filter` ({"from", "to", "status"} as in the export).
+        """
+        target = str(request.data.get('status') or '').upper()
+        ids = request.data.get('ids')
+        order_filter = request.data.get('filter')
+
+        if target not in OrderHistory.STATUS_TRANSITIONS or (ids is None) == (order_filter is None):
+            return Response(
+                {'error': 'status and exactly one of ids or filter are required',
+                 'statuses': list(OrderHistory.STATUS_TRANSITIONS)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            if ids is not None:
+                if not isinstance(ids, list) or not ids:
+                    raise ValueError('ids must be a non-empty list')
+                ids = list(dict.fromkeys(int(order_id) for order_id in ids))
+                queryset = OrderHistory.objects.filter(pk__in=ids)
+            else:
+                if not isinstance(order_filter, dict):
+                    raise ValueError('filter must be an object')
+                queryset = OrderHistory.objects.filter(**parse_order_filters(
+                    order_filter.get('from'), order_filter.get('to'), order_filter.get('status'),
+                ))
+        except (TypeError, ValueError) as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = OrderHistory.objects.transition(queryset, target)
+        if ids is not None:
+            for order_id in ids:
+                results.setdefault(order_id, 'not found')
+
+        return Response({
+            'status': target,
+            'updated': sum(error is None for error in results.values()),
+            'results': [
+                {'id': order_id, 'updated': error is None, **({'error': error} if error else {})}
+                for order_id, error in results.items()
+            ],
+        })
+
+    @action(detail=False, methods=['get'], url_path='export', permission_classes=[permissions.IsAdminUser])
+    def export(self, request):
+        """Staff-only CSV of all orders, streamed; filter with ?from=&to=&status="""
+        try:
+            filters = parse_order_filters(
+                request.query_params.get('from'),
+                request.query_params.get('to'),
+                request.query_params.get('status'),
+            )
+        except ValueError as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(order_csv_chunks(filters), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="orders.csv"'
+        return response
+
+
+class ReviewViewSet(FastListMixin, viewsets.ModelViewSet):
+    """Product reviews; `?product=<id>` lists one product's."""
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        product = self.request.query_params.get('product')
+        if product is not None and self.action == 'list':
+            if not product.isdigit():
+                raise ValidationError({'product': 'Must be a product id.'})
+            queryset = queryset.filter(product_id=product)
+        return queryset
 
 
 class ContactViewSet(viewsets.ModelViewSet):
@@ -177,27 +652,89 @@ class LoginView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        user = None
-        if "@" in identifier:
-            user = authenticate(request, username=identifier, password=password)
-        else:
-            try:
-                user_obj = User.objects.get(phone_number=identifier)
-                if user_obj.check_password(password):
-                    user = user_obj
-            except User.DoesNotExist:
-                pass
+        # A single query resolves email or phone and joins the existing token
+        user = authenticate(request, username=identifier, password=password)
 
         if not user:
             return Response({"error": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        token, _ = Token.objects.get_or_create(user=user)
+        try:
+            token = user.auth_token
+        except Token.DoesNotExist:
+            token, _ = Token.objects.get_or_create(user=user)
         return Response(
             {"token": token.key, "user": UserSerializer(user).data},
             status=status.HTTP_200_OK,
         )
 
 
+class LogoutView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        # Deleting the token also drops it from the token cache (api.signals)
+        Token.objects.filter(user=request.user).delete()
+        return Response({"message": "Logged out"}, status=status.HTTP_200_OK)
+
+
+# -----------------------------
+# STAFF ANALYTICS
+# -----------------------------
+class SalesAnalyticsView(APIView):
+    """
+    Revenue, units and orders from the DailySales rollup (never OrderHistory).
+    ?from=&to= (dates), ?group_by=day,product,variant,status, ?product=, ?status=
+    """
+    permission_classes = [permissions.IsAdminUser]
+    group_fields = {
+        'day': ['day'],
+        'product': ['product_id', 'product__product_name'],
+        'variant': ['variant'],
+        'status': ['status'],
+    }
+
+    def get(self, request):
+        params = request.query_params
+        group_by = [name.strip() for name in params.get('group_by', 'day').split(',') if name.strip()]
+        unknown = [name for name in group_by if name not in self.group_fields]
+        if unknown:
+            return Response(
+                {'error': f"Cannot group by {unknown}; choose from {list(self.group_fields)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rows = DailySales.objects.order_by()
+        for lookup, name in [('day__gte', 'from'), ('day__lte', 'to')]:
+            if params.get(name):
+                day = parse_date(params[name])
+                if day is None:
+                    return Response(
+                        {'error': f"'{name}' must be a date like 2025-01-31"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                rows = rows.filter(**{lookup: day})
+        try:
+            if params.get('product'):
+                rows = rows.filter(product_id__in=parse_ids(params['product'], 'product'))
+            if params.get('status'):
+                rows = rows.filter(status__in=parse_statuses(params['status']))
+        except ValueError as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        fields = [field for name in group_by for field in self.group_fields[name]]
+        totals = {'orders': Sum('orders'), 'units': Sum('units'), 'revenue': Sum('revenue')}
+        results = list(rows.values(*fields).annotate(**totals).order_by(*fields))
+        return Response({'results': results, 'totals': rows.aggregate(**totals)})
+
+
+class MetricsView(APIView):
+    """Staff-only request metrics for this worker process, in the Prometheus text format."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 class ProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]